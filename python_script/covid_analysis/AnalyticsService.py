@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from python_script.covid_analysis.DataAnalyser import DataAnalyzer
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Upper bounds of the latency histogram buckets, in milliseconds (the last bucket is unbounded)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_HEADER_LINES = 100
+
+
+class LatencyHistogram:
+    """
+    Request latencies of one endpoint in fixed buckets (see `LATENCY_BUCKETS_MS`).
+
+    Recording is O(log buckets) and memory is constant however many requests
+    are served. Percentiles are estimated as the upper bound of the bucket
+    holding that rank.
+    """
+
+    def __init__(self, bounds_ms: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float | None:
+        """ Upper bound (ms) of the bucket holding the q-quantile, capped at the max seen """
+        if self.count == 0:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"le_{bound:g}ms": count for bound, count in zip(self.bounds_ms, self.counts)}
+            buckets['inf'] = self.counts[-1]
+            return {
+                'count': self.count,
+                'mean_ms': self.total_ms / self.count if self.count else None,
+                'p50_ms': self.percentile(0.5), 'p95_ms': self.percentile(0.95),
+                'p99_ms': self.percentile(0.99), 'max_ms': self.max_ms,
+                'buckets': buckets,
+            }
+
+
+class RequestError(Exception):
+    """ A client error, answered with `status` and a JSON error message """
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalyticsService:
+    """
+    Local HTTP/JSON service answering `DataAnalyzer` queries from warm, long-lived analyzers.
+
+    One analyzer per dataset is created and loaded when the service starts,
+    so requests skip interpreter start-up, imports and CSV parsing; later
+    queries also hit the analyzers' memo, indexes and caches. Endpoints
+    (``GET``, parameters in the query string, ``dataset`` selecting the
+    dataset and defaulting to the first one):
+
+    * ``/summarize`` -- ``column``, ``sort_by`` (`summarize_data`)
+    * ``/filter`` -- ``column``, ``threshold`` (`filter_data`)
+    * ``/top`` -- ``n``, ``column``, ``order=desc|asc``, ``per_group`` (`get_top_n` / `get_bottom_n`)
+    * ``/group`` -- ``by`` (repeatable), ``ascending`` (`group_data`)
+    * ``/lookup`` -- ``key`` (repeatable), ``column`` (`lookup`)
+    * ``/datasets``, ``/stats`` (per-endpoint latency histograms), ``/health``
+
+    Results are JSON ``{"dataset", "rows", "columns", "data": [records]}``.
+    Queries run in a thread pool so the event loop keeps accepting
+    connections while pandas works. Identical requests that arrive while
+    one is in flight are coalesced and share its result instead of
+    computing it again.
+
+    Analyzers come from `analyzer_factory`, by default a `DataAnalyzer`
+    whose `IOInstrumentation` records loads without printing them, so
+    serving requests writes nothing to the console.
+
+    Examples
+    --------
+    ``python -m python_script.covid_analysis.AnalyticsService --port 8765`` then
+    ``curl 'http://127.0.0.1:8765/top?n=3&column=Deaths'``.
+    """
+
+    def __init__(self, datasets: Mapping[str, str | Path], host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, workers: int | None = None,
+                 analyzer_factory: Callable[[str], DataAnalyzer] | None = None):
+        if not datasets:
+            raise ValueError("Parameter 'datasets' must name at least one dataset.")
+        self.datasets = {name: str(path) for name, path in datasets.items()}
+        self.host = host
+        self.port = port
+        analyzer_factory = analyzer_factory or _quiet_analyzer
+        self.analyzers = {name: analyzer_factory(path) for name, path in self.datasets.items()}
+        # Column dtypes per analyzer, with the data version they were read from
+        self._dtypes: dict[DataAnalyzer, tuple[tuple, dict]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                            thread_name_prefix='analytics')
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.coalesced: dict[str, int] = {}
+        self._server: asyncio.Server | None = None
+        self._routes = {
+            '/summarize': self._summarize, '/filter': self._filter, '/top': self._top,
+            '/group': self._group, '/lookup': self._lookup,
+        }
+
+    # -- lifecycle -------------------------------------------------------------------------------
+
+    async def start(self) -> 'AnalyticsService':
+        """ Load every dataset, then start listening (`port` 0 picks a free port) """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, analyzer.load_data)
+                               for analyzer in self.analyzers.values()))
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- query execution -------------------------------------------------------------------------
+
+    async def query(self, endpoint: str, params: Mapping[str, list[str]]) -> bytes:
+        """ Answer one endpoint request as a JSON body, coalescing identical in-flight requests """
+        if endpoint not in self._routes:
+            raise RequestError(f"Unknown endpoint '{endpoint}'.", HTTPStatus.NOT_FOUND)
+        key = (endpoint, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced[endpoint] = self.coalesced.get(endpoint, 0) + 1
+            # Shielded: one waiter disconnecting must not cancel the others' shared query
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, endpoint, params)
+        self._inflight[key] = future
+        # Dropped when the query finishes, even if every waiter has gone away meanwhile
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _run(self, endpoint: str, params: Mapping[str, list[str]]) -> bytes:
+        """ Executor side: run the query and serialize its result (both CPU-bound) """
+        name = _param(params, 'dataset', next(iter(self.analyzers)))
+        if name not in self.analyzers:
+            raise RequestError(f"Unknown dataset '{name}'. Choose from {sorted(self.analyzers)}.",
+                               HTTPStatus.NOT_FOUND)
+        df = self._routes[endpoint](self.analyzers[name], params)
+        # to_json writes NaN as null and numpy scalars natively, unlike json.dumps
+        return (f'{{"dataset": {json.dumps(name)}, "rows": {len(df)}, '
+                f'"columns": {json.dumps([str(col) for col in df.columns])}, '
+                f'"data": {df.to_json(orient="records")}}}').encode()
+
+    @staticmethod
+    def _summarize(analyzer: DataAnalyzer, params) -> pd.DataFrame:
+        return analyzer.summarize_data(_param(params, 'column', 'WHO Region'),
+                                       _param(params, 'sort_by', 'Confirmed'))
+
+    @staticmethod
+    def _filter(analyzer: DataAnalyzer, params) -> pd.DataFrame:
+        return analyzer.filter_data(_param(params, 'column', 'Confirmed'),
+                                    _param(params, 'threshold', 10, float))
+
+    @staticmethod
+    def _top(analyzer: DataAnalyzer, params) -> pd.DataFrame:
+        order = _param(params, 'order', 'desc')
+        if order not in ('asc', 'desc'):
+            raise RequestError("Parameter 'order' must be 'asc' or 'desc'.")
+        select = analyzer.get_top_n if order == 'desc' else analyzer.get_bottom_n
+        return select(_param(params, 'n', 5, int), _param(params, 'column', 'Confirmed'),
+                      per_group=_param(params, 'per_group', None))
+
+    @staticmethod
+    def _group(analyzer: DataAnalyzer, params) -> pd.DataFrame:
+        return analyzer.group_data(tuple(params.get('by', ['WHO Region'])),
+                                   ascending=_param(params, 'ascending', False, _as_bool))
+
+    def _lookup(self, analyzer: DataAnalyzer, params) -> pd.DataFrame:
+        if not params.get('key'):
+            raise RequestError("Parameter 'key' is required.")
+        key_column = _param(params, 'column', 'Country/Region')
+        keys = params['key']
+        if self._is_numeric_column(analyzer, key_column):
+            # Keys arrive as strings; compare them as numbers against a numeric key column
+            keys = list(pd.to_numeric(pd.Series(keys), errors='coerce').dropna())
+        return analyzer.lookup(keys, key_column)
+
+    def _is_numeric_column(self, analyzer: DataAnalyzer, column: str) -> bool:
+        """ Whether `column` is numeric, from the schema or from dtypes read once per data version """
+        schema = analyzer.schema
+        if schema is not None and column in schema.column_set:
+            return column in schema.numeric_columns
+        cached = self._dtypes.get(analyzer)
+        if cached is None or cached[0] != analyzer.data_version:
+            df = analyzer.load_data()
+            # Read the version after loading: the load may have refreshed it
+            cached = self._dtypes[analyzer] = (analyzer.data_version, df.dtypes.to_dict())
+        return column in cached[1] and is_numeric_dtype(cached[1][column])
+
+    def stats(self) -> dict:
+        """ Latency histogram and coalesced-request count per endpoint """
+        return {endpoint: {**histogram.snapshot(), 'coalesced': self.coalesced.get(endpoint, 0)}
+                for endpoint, histogram in self.histograms.items()}
+
+    # -- HTTP ------------------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """ Serve requests on one connection until the client closes it (HTTP/1.1 keep-alive) """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = await self._read_headers(reader)
+                length = int(headers.get('content-length', 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+                status, body = await self._respond(request_line.decode('latin-1'))
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: %d\r\nConnection: %s\r\n\r\n'
+                             % (status, status.phrase.encode(), len(body),
+                                b'keep-alive' if keep_alive else b'close') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    async def _respond(self, request_line: str) -> tuple[HTTPStatus, bytes]:
+        started = time.perf_counter()
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, _error("Malformed request line.")
+        url = urlsplit(target)
+        endpoint = url.path.rstrip('/') or '/'
+        try:
+            if method != 'GET':
+                raise RequestError("Only GET is supported.", HTTPStatus.METHOD_NOT_ALLOWED)
+            if endpoint == '/health':
+                return HTTPStatus.OK, b'{"status": "ok"}'
+            if endpoint == '/stats':
+                return HTTPStatus.OK, json.dumps(self.stats()).encode()
+            if endpoint == '/datasets':
+                return HTTPStatus.OK, json.dumps(self.datasets).encode()
+            body = await self.query(endpoint, parse_qs(url.query))
+            status = HTTPStatus.OK
+        except RequestError as e:
+            status, body = e.status, _error(str(e))
+        except (ValueError, TypeError, KeyError) as e:
+            status, body = HTTPStatus.BAD_REQUEST, _error(str(e))
+        except Exception as e:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, _error(f"{type(e).__name__}: {e}")
+        if endpoint in self._routes:
+            self.histograms.setdefault(endpoint, LatencyHistogram()).record(time.perf_counter() - started)
+        return status, body
+
+
+def _quiet_analyzer(path: str) -> DataAnalyzer:
+    """ Default analyzer factory: I/O events are recorded but not printed per request """
+    return DataAnalyzer(path, instrumentation=IOInstrumentation(console=False))
+
+
+def _param(params: Mapping[str, list[str]], name: str, default, convert: Callable = str):
+    """ Last value of query parameter `name`, converted, or `default` if absent """
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise RequestError(f"Invalid value for parameter '{name}': {values[-1]!r}.") from None
+
+
+def _as_bool(value: str) -> bool:
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def _error(message: str) -> bytes:
+    return json.dumps({'error': message}).encode()
+
+
+def main(argv: list[str] | None = None):
+    default_csv = Path(__file__).resolve().parents[2] / 'resources' / 'country_wise_latest.csv'
+    parser = argparse.ArgumentParser(description="Serve DataAnalyzer queries over local HTTP/JSON.")
+    parser.add_argument('--dataset', action='append', metavar='NAME=CSV',
+                        help=f"dataset to serve (repeatable); default covid={default_csv}")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="query threads")
+    args = parser.parse_args(argv)
+
+    datasets = dict(spec.split('=', 1) for spec in args.dataset) if args.dataset else {'covid': default_csv}
+    service = AnalyticsService(datasets, args.host, args.port, args.workers)
+
+    async def run():
+        await service.start()
+        print(f"Serving {sorted(datasets)} on http://{service.host}:{service.port}")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
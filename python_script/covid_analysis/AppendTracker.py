@@ -0,0 +1,78 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pandas as pd
+
+GUARD_BYTES = 64 * 1024  # bytes hashed at the start and just before the ingested offset
+
+
+class AppendTracker:
+    """
+    Remembers how much of a CSV has been ingested, to read only appended rows.
+
+    A tracker records the byte offset and row count already parsed, plus
+    hashes of the first bytes of the file and of the bytes just before the
+    offset. When the file later grows and both guard hashes still match, the
+    change is treated as an append and only the bytes after the offset are
+    parsed. Any other change (shrink, edited head or tail, last ingested line
+    without a newline) is reported as a rewrite, so the caller falls back to
+    a full reload.
+    """
+
+    UNCHANGED = 'unchanged'
+    APPENDED = 'appended'
+    REWRITTEN = 'rewritten'
+
+    def __init__(self, file_path: str | Path, offset: int, rows: int, mtime_ns: int):
+        self.file_path = Path(file_path)
+        self.offset = offset
+        self.rows = rows
+        self.mtime_ns = mtime_ns
+        self._head_hash, self._tail_hash, self._ends_with_newline = self._guards(offset)
+
+    def _guards(self, offset: int) -> tuple[str, str, bool]:
+        with open(self.file_path, 'rb') as fh:
+            head = fh.read(min(GUARD_BYTES, offset))
+            tail_start = max(0, offset - GUARD_BYTES)
+            fh.seek(tail_start)
+            tail = fh.read(offset - tail_start)
+        return (hashlib.blake2b(head, digest_size=16).hexdigest(),
+                hashlib.blake2b(tail, digest_size=16).hexdigest(),
+                tail.endswith(b'\n'))
+
+    def check(self) -> str:
+        """ Classify the current file against the ingested state """
+        stat = self.file_path.stat()
+        if stat.st_size < self.offset:
+            return self.REWRITTEN
+        if self._guards(self.offset) != (self._head_hash, self._tail_hash, self._ends_with_newline):
+            return self.REWRITTEN
+        if stat.st_size == self.offset:
+            return self.UNCHANGED
+        # Appended bytes can only be parsed if the last ingested row was complete
+        return self.APPENDED if self._ends_with_newline else self.REWRITTEN
+
+    def read_appended(self, names: list[str], usecols: list[str] | None = None,
+                      dtypes: dict | None = None) -> tuple[pd.DataFrame, 'AppendTracker']:
+        """
+        Parse the rows appended after the ingested offset.
+
+        Only complete lines are consumed; a row still being written is left
+        for the next call. Returns the new rows and a tracker for the new
+        offset.
+        """
+        stat = self.file_path.stat()
+        with open(self.file_path, 'rb') as fh:
+            fh.seek(self.offset)
+            appended = fh.read(stat.st_size - self.offset)
+        appended = appended[:appended.rfind(b'\n') + 1]
+
+        if appended.strip():
+            tail = pd.read_csv(io.BytesIO(appended), header=None, names=names, usecols=usecols, dtype=dtypes)
+        else:
+            tail = pd.DataFrame(columns=usecols if usecols is not None else names)
+        if usecols is not None:
+            tail = tail[usecols]
+        tracker = AppendTracker(self.file_path, self.offset + len(appended), self.rows + len(tail), stat.st_mtime_ns)
+        return tail, tracker
@@ -0,0 +1,167 @@
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from python_script.covid_analysis.ColumnTable import ColumnTable
+from python_script.covid_analysis.DataAnalyser import DataAnalyzer
+from python_script.covid_analysis.QueryMemo import memoized
+from python_script.covid_analysis.SortedIndex import SortedIndex
+
+VALUE_COLUMNS = ['Confirmed', 'Deaths', 'Recovered']
+
+
+class ArrayAnalyzer(DataAnalyzer):
+    """
+    `DataAnalyzer` answering its queries on NumPy column arrays (see `ColumnTable`).
+
+    Meant for small tables queried at high rates, such as a lookup service
+    over ``country_wise_latest.csv``, where pandas' per-call overhead costs
+    far more than the computation. The loaded frame is converted to a
+    `ColumnTable` once per `data_version`. Each query then runs as a few
+    array operations and builds one DataFrame for its result.
+
+    `summarize_data`, `filter_data`, `sort_data`, `get_top_n`,
+    `get_bottom_n`, `detect_outliers`, `group_data`,
+    `identify_zero_recovered`, `fetch_data_by_country_by_column` and
+    `lookup` keep their `DataAnalyzer` signatures and results; `lookup_arrays`
+    returns plain arrays for callers that do not need a DataFrame. Arguments the
+    arrays do not cover (streaming `chunksize`, several ranking columns,
+    `per_group`, non-numeric or non-encoded columns) fall back to the
+    inherited pandas implementation. Result rows are ordered by stable sorts,
+    so ties keep group-key or file order, and integer group sums are always
+    int64 (pandas keeps a narrow dtype while the totals fit in it).
+    """
+
+    def __init__(self, file_path, **options):
+        super().__init__(file_path, **options)
+        self._table: tuple[tuple, ColumnTable] | None = None
+
+    def table(self) -> ColumnTable:
+        """ The column arrays of the loaded data, rebuilt when `data_version` changes """
+        version = self.data_version
+        if self._table is None or self._table[0] != version:
+            df = self.load_data()
+            # Read the version again: loading may have refreshed it
+            self._table = (self.data_version, ColumnTable(df))
+        return self._table[1]
+
+    def invalidate_cache(self, drop_sidecar: bool = False):
+        """ Invalidate cached frames, results and the column arrays """
+        super().invalidate_cache(drop_sidecar=drop_sidecar)
+        self._table = None
+
+    @staticmethod
+    def _ordered_frame(df: pd.DataFrame, column_name: str, ascending: bool) -> pd.DataFrame:
+        """ A small result frame stably ordered by `column_name` """
+        return df.take(SortedIndex(df[column_name].to_numpy()).ordered(ascending))
+
+    @memoized
+    def summarize_data(self, column_name: str='WHO Region', sort_by: str='Confirmed',
+                       chunksize: int | None = None):
+        """ 1. Display total confirmed, death, and recovered cases for each region (on arrays) """
+        table = self.table()
+        self._require_columns([column_name] + VALUE_COLUMNS)
+        if chunksize is not None or not table.groupable([column_name]) or not table.is_numeric(sort_by):
+            return super().summarize_data(column_name, sort_by, chunksize)
+        return self._ordered_frame(table.group_sums([column_name], VALUE_COLUMNS), sort_by, ascending=False)
+
+    @memoized
+    def filter_data(self, column_name='Confirmed', threshold=10, chunksize: int | None = None):
+        """ 2. Exclude entries where confirmed cases are < 10 (on arrays) """
+        table = self.table()
+        self._require_columns([column_name])
+        if chunksize is not None or not table.is_numeric(column_name):
+            return super().filter_data(column_name, threshold, chunksize)
+        return table.frame(table.greater_than(column_name, threshold))
+
+    @memoized
+    def sort_data(self, column_name='Confirmed', ascending=True):
+        """ 4. Sort Data by Confirmed Cases (on arrays) """
+        table = self.table()
+        self._require_columns([column_name])
+        if not table.is_numeric(column_name):
+            return super().sort_data(column_name, ascending)
+        return table.frame(table.ordered(column_name, ascending))
+
+    @memoized
+    def get_top_n(self, n=5, column_name: str | Sequence[str]='Confirmed',
+                  per_group: str | Sequence[str] | None = None):
+        """ 5. Top 5 Countries by Case Count (on arrays) """
+        return self._select_n_arrays(n, column_name, ascending=False, per_group=per_group)
+
+    @memoized
+    def get_bottom_n(self, n=5, column_name: str | Sequence[str]='Deaths',
+                     per_group: str | Sequence[str] | None = None):
+        """ 6. Region with Lowest Death Count (on arrays) """
+        return self._select_n_arrays(n, column_name, ascending=True, per_group=per_group)
+
+    def _select_n_arrays(self, n: int, column_name: str | Sequence[str], ascending: bool,
+                         per_group: str | Sequence[str] | None) -> pd.DataFrame:
+        table = self.table()
+        if per_group is not None or not isinstance(column_name, str) \
+                or column_name not in table.columns or not table.is_numeric(column_name):
+            return self._select_n(n, column_name, ascending, per_group)
+        return table.frame(table.top_n(column_name, n, ascending))
+
+    @memoized
+    def detect_outliers(self, column_name='Confirmed', z: float = 2.0, chunksize: int | None = None):
+        """ 10. Detect Outliers in Case Counts and Use mean ± 2*std deviation (on arrays) """
+        table = self.table()
+        self._require_columns([column_name])
+        if chunksize is not None or not table.is_numeric(column_name):
+            return super().detect_outliers(column_name, z, chunksize)
+        lower_bound, upper_bound = self.column_stats(column_name).bounds(z)
+        return table.frame(table.outside(column_name, lower_bound, upper_bound))
+
+    @memoized
+    def group_data(self, group_by_columns: Sequence[str], ascending=False, chunksize: int | None = None):
+        """ Group Data by Country and Region (on arrays) """
+        table = self.table()
+        self._require_columns(list(group_by_columns) + VALUE_COLUMNS)
+        if chunksize is not None or not table.groupable(group_by_columns):
+            return super().group_data(group_by_columns, ascending, chunksize)
+        grouped = self._ordered_frame(table.group_sums(group_by_columns, VALUE_COLUMNS), 'Confirmed', ascending)
+        return grouped.reset_index(drop=True)
+
+    @memoized
+    def identify_zero_recovered(self, column_name: str='Recovered'):
+        """ Identify Regions with Zero Recovered Cases (on arrays) """
+        table = self.table()
+        self._require_columns([column_name])
+        if not table.is_numeric(column_name):
+            return super().identify_zero_recovered(column_name)
+        return table.frame(table.equal_to(column_name, 0))
+
+    @memoized
+    def fetch_data_by_country_by_column(self, country_names: Sequence[str],
+                                        column_names: Sequence[str],
+                                        filter_by: str='Country/Region'):
+        """ Fetch data for a specific country (on arrays) """
+        table = self.table()
+        self._require_columns([filter_by] + list(column_names))
+        if not table.groupable([filter_by]):
+            return super().fetch_data_by_country_by_column(country_names, column_names, filter_by)
+        return table.frame(table.lookup(filter_by, country_names), column_names)
+
+    def lookup(self, keys: Hashable | Sequence[Hashable], key_column: str='Country/Region') -> pd.DataFrame:
+        """ Rows whose `key_column` equals `keys` (one key or a batch), in file order (on arrays) """
+        table = self.table()
+        self._require_columns([key_column])
+        if not table.groupable([key_column]):
+            return super().lookup(keys, key_column)
+        return table.frame(table.lookup(key_column, keys))
+
+    def lookup_arrays(self, keys: Hashable | Sequence[Hashable], key_column: str='Country/Region',
+                      column_names: Sequence[str] | None = None) -> dict[str, np.ndarray]:
+        """
+        Like `lookup`, but returns one NumPy array per column instead of a DataFrame.
+
+        Skipping the DataFrame boundary keeps a lookup in the microseconds,
+        for callers that serialize the values anyway.
+        """
+        table = self.table()
+        self._require_columns([key_column] + list(column_names or []))
+        if not table.groupable([key_column]):
+            raise TypeError(f"Column '{key_column}' is not a key column.")
+        return table.arrays(table.lookup(key_column, keys), column_names)
@@ -1,14 +1,49 @@
+import time
+from collections.abc import Iterator, Sequence
 from pathlib import Path
 
 import pandas as pd
 import numpy as np
 
+from python_script.covid_analysis.AppendTracker import AppendTracker
+from python_script.covid_analysis.CompactSchema import CompactSchema
+from python_script.covid_analysis.DatasetSchema import DatasetSchema, detect_schema, get_schema
+from python_script.covid_analysis.DataExporter import DataExporter, get_exporter
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation, get_instrumentation
+from python_script.covid_analysis.SharedDataFrameCache import SharedDataFrameCache, get_shared_cache
+from python_script.covid_analysis.SidecarCache import SidecarCache
+
 class CSVHandler:
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_sidecar: bool = True, cache: SharedDataFrameCache | None = None,
+                 compact: bool = False, instrumentation: IOInstrumentation | None = None,
+                 schema: DatasetSchema | str | None = 'auto'):
         self.file_path = file_path
-        self._data_cache = None  # lazy-loaded cache
+        # Every load/export reports an event (rows, bytes, timings, cache hit) here instead of printing
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+        # Default for load_data(compact=...), so subclasses' queries run on compact dtypes too
+        self.compact = compact
+        # Loaded frames live in a process-wide cache shared by every handler on the same file;
+        # the handler only remembers which file version it loaded per load variant (lazy-loaded cache)
+        self._cache = cache if cache is not None else get_shared_cache()
+        self._cache_keys: dict[tuple, tuple] = {}
+        self._compact_schema: CompactSchema | None = None
+        self._header: list[str] | None = None
+        # Byte offset / row count ingested per load variant, for append-only reloads
+        self._trackers: dict[tuple, AppendTracker] = {}
+        # Cache key a frame was extended from by an append-only reload, so state derived
+        # from the earlier version (e.g. running statistics) can be extended too
+        self._appended_from: dict[tuple, tuple] = {}
+        # Columnar binary copy of the CSV, reused across processes while the CSV is unchanged
+        self._sidecar = SidecarCache(file_path) if use_sidecar else None
+        # Schema (or registered schema name) frames are validated against once at load;
+        # 'auto' picks the registered schema the header matches, None disables validation
+        self._schema_option = schema
+        self._schema: DatasetSchema | None = None
+        self._schema_resolved = False
 
-    def load_data(self, reload: bool = False, copy: bool = False):
+    def load_data(self, reload: bool = False, copy: bool = False, compact: bool | None = None,
+                  float32: bool = False, columns: Sequence[str] | None = None,
+                  incremental: bool = False):
         """
         Load (and cache) the CSV as a DataFrame.
 
@@ -20,6 +55,22 @@ class CSVHandler:
             Return a defensive copy. Set to True only if the caller intends
             to mutate the returned DataFrame in-place. Keeping this False
             avoids unnecessary memory usage on large datasets.
+        compact : bool, optional
+            Load with memory-compact dtypes (see `CompactSchema`): low-cardinality
+            strings become ``category`` and integer counts use the narrowest
+            safe width. The schema is inferred on the first compact load and
+            reused afterwards; `compact_report` holds the memory saved.
+            Defaults to the handler's `compact` setting.
+        float32 : bool, default False
+            With `compact=True`, also store float (rate) columns as ``float32``.
+        columns : sequence of str, optional
+            Parse and return only these columns, in this order. All columns
+            by default.
+        incremental : bool, default False
+            With `reload=True`, parse only the rows appended to the CSV since
+            it was last ingested and concatenate them to the cached frame.
+            Falls back to a full reload when the file was rewritten rather
+            than appended to (see `AppendTracker`).
 
         Notes
         -----
@@ -28,27 +79,450 @@ class CSVHandler:
           * request a copy via `copy=True`, or
           * explicitly call `invalidate_cache()` then `load_data(reload=True)`
             after external modifications to the source file.
+
+        When the sidecar is enabled, the first parse of the CSV also writes a
+        columnar ``<csv>.sidecar.npz`` next to it. Later reads from disk
+        (including `reload=True`) use the sidecar instead of re-parsing as long
+        as the CSV's size, mtime and content hash are unchanged.
+
+        The cached frame is shared (see `SharedDataFrameCache`) with every
+        other handler that loaded the same version of the same file. If the
+        shared cache evicted it to stay within its memory budget, the next
+        call transparently reads it from disk again.
+
+        The cache is column-aware: after a `columns=` load only those columns
+        are held, and a later request for more columns parses just the
+        missing ones and adds them to the cached frame.
+
+        Frames read from disk are checked and coerced once by `schema` (see
+        `DatasetSchema`); the cached frame carries its stamp, so queries do
+        not re-validate it.
+
+        Every call emits one ``'load'`` event to `instrumentation` (see
+        `IOInstrumentation`) with its source, shape, bytes read and timing.
+        """
+        with self.instrumentation.measure('load', self.file_path) as event:
+            df = self._load(reload, compact, float32, columns, incremental, event)
+            if copy:
+                df = df.copy()
+            event.update(rows=len(df), columns=df.shape[1])
+        return df
+
+    def _load(self, reload: bool, compact: bool | None, float32: bool, columns: Sequence[str] | None,
+              incremental: bool, event: dict) -> pd.DataFrame:
+        """
+        Body of `load_data`; records where the frame came from on `event`.
+
+        A cache hit returns without locking. Everything else runs under the
+        file's load lock (see `SharedDataFrameCache.lock`) and re-checks the
+        cache first, so when several threads miss at once exactly one reads
+        the file and the others return the frame it stored (single flight).
+        A reload that waited while another thread stored a frame of the
+        current file version shares that frame instead of reading again.
+        """
+        if compact is None:
+            compact = self.compact
+        if reload:
+            self._reset_header()
+        if columns is not None:
+            columns = list(columns)
+            header = self.read_columns()
+            missing_columns = [col for col in columns if col not in header]
+            if missing_columns:
+                raise ValueError(f"Columns not found in the dataset: {missing_columns}")
+        variant = ('compact', float32) if compact else ()
+
+        if not reload:
+            df = self._cached_frame(variant, columns, event)
+            if df is not None:
+                return df
+        generation = self._cache.generation(self.file_path, *self._schema_key(), *variant) if reload else None
+        with self._cache.lock(self.file_path):
+            if reload and self._cache.generation(self.file_path, *self._schema_key(), *variant) != generation:
+                # Stored by another thread while this one waited; reused below if it is
+                # the current file version (the key is rebuilt from a fresh stat)
+                self._cache_keys.pop(variant, None)
+                reload = False
+            return self._load_locked(reload, compact, float32, columns, incremental, variant, event)
+
+    def _cached_frame(self, variant: tuple, columns: list[str] | None, event: dict) -> pd.DataFrame | None:
+        """ Lock-free fast path: the cached frame, if it holds every requested column """
+        key = self._cache_keys.get(variant) or self._make_cache_key(variant)
+        df = self._cache.peek(key)
+        if df is None or self._missing_columns(df, columns):
+            return None
+        df = self._cache.get(key)
+        if df is None:
+            return None
+        # Using cached version
+        event.update(source='cache', cache_hit=True)
+        if self._cache_keys.get(variant) != key:
+            # Recorded under the load lock, which `invalidate_cache` holds while clearing the keys,
+            # and only if an invalidation did not drop the frame meanwhile
+            with self._cache.lock(self.file_path):
+                if self._cache.peek(key) is not None:
+                    self._cache_keys[variant] = key
+        if columns is not None and list(df.columns) != columns:
+            df = self._project(df, columns)
+        return df
+
+    def _load_locked(self, reload: bool, compact: bool, float32: bool, columns: list[str] | None,
+                     incremental: bool, variant: tuple, event: dict) -> pd.DataFrame:
+        df = None
+        if reload and incremental:
+            key, df = self._reload_appended(variant, event)
+        elif not reload:
+            key = self._cache_keys.get(variant) or self._make_cache_key(variant)
+            df = self._cache.get(key)
+            if df is not None:
+                # Using cached version
+                event.update(source='cache', cache_hit=True)
+        if df is not None:
+            missing = self._missing_columns(df, columns)
+            if missing:
+                event['cache_hit'] = False
+                df = self._add_columns(key, df, missing, compact, float32, event)
+        if df is None:
+            base_key = self._make_cache_key() if compact and not reload else None
+            base = self._cache.peek(base_key) if base_key is not None else None
+            if base is not None and not self._missing_columns(base, columns):
+                # A compact load can be derived from the default frame if it is already in memory
+                key, df = base_key, base if columns is None else base[columns]
+                event.update(source='cache', cache_hit=True)
+            else:
+                key, df = self._read_from_disk(columns, event)
+            if compact:
+                df = self._compact(df, float32)
+            key += variant
+            self._cache.put(key, df)
+            self._track_ingested(variant, key, df)
+        self._cache_keys[variant] = key
+
+        if columns is not None and list(df.columns) != columns:
+            df = self._project(df, columns)
+        return df
+
+    @staticmethod
+    def _project(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+        """ `columns` of the cached `df` as a frame sharing its arrays (``df[columns]`` would copy them) """
+        return pd.DataFrame({col: df[col] for col in columns}, index=df.index, columns=columns, copy=False)
+
+    def _track_ingested(self, variant: tuple, key: tuple, df: pd.DataFrame):
+        """ Remember the offset/rows behind a full read, unless the file moved on during it """
+        self._trackers.pop(variant, None)
+        try:
+            if self._make_cache_key()[1:3] == key[1:3]:
+                self._trackers[variant] = AppendTracker(self.file_path, offset=key[1], rows=len(df), mtime_ns=key[2])
+        except FileNotFoundError:
+            pass
+
+    def _reload_appended(self, variant: tuple, event: dict) -> tuple[tuple | None, pd.DataFrame | None]:
+        """
+        Concatenate rows appended since the last ingest to the cached frame.
+
+        Returns ``(None, None)`` when a full reload is needed instead: nothing
+        cached yet, or the file was rewritten rather than appended to.
+        """
+        key = self._cache_keys.get(variant)
+        tracker = self._trackers.get(variant)
+        cached = self._cache.peek(key) if key is not None else None
+        if cached is None or tracker is None:
+            return None, None
+        try:
+            state = tracker.check()
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"CSV file not found: {self.file_path}") from e
+        if state == AppendTracker.REWRITTEN:
+            return None, None
+
+        event.update(source='cache', cache_hit=True)
+        if state == AppendTracker.APPENDED:
+            # Parse string columns as strings so a short tail cannot infer them as numbers
+            text_columns = {col: object for col in cached.columns
+                            if cached[col].dtype == object or isinstance(cached[col].dtype, pd.CategoricalDtype)}
+            tail, new_tracker = tracker.read_appended(self.read_columns(), usecols=list(cached.columns),
+                                                      dtypes=text_columns)
+            cached = self._validate(self._concat_appended(cached, tail))
+            self._trackers[variant] = new_tracker
+            event.update(source='append', cache_hit=False, bytes_read=new_tracker.offset - tracker.offset)
+
+        new_key = self._make_cache_key(variant)
+        self._cache.put(new_key, cached)
+        if new_key != key:
+            self._appended_from[new_key] = key
+        return new_key, cached
+
+    @staticmethod
+    def _concat_appended(cached: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+        """ Append `tail` to `cached`, keeping the cached (possibly compact) dtypes where they fit """
+        if tail.empty:
+            return cached
+        head_columns = {}
+        for col in cached.columns:
+            dtype = cached[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                new_categories = pd.Index(tail[col].dropna().unique()).difference(dtype.categories)
+                if len(new_categories):
+                    head_columns[col] = cached[col].cat.add_categories(new_categories)
+                    dtype = head_columns[col].dtype
+                tail[col] = tail[col].astype(dtype)
+            elif pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(tail[col].dtype):
+                info = np.iinfo(dtype)
+                if tail[col].empty or (info.min <= tail[col].min() and tail[col].max() <= info.max):
+                    tail[col] = tail[col].astype(dtype)
+        if head_columns:
+            cached = cached.assign(**head_columns)
+        return pd.concat([cached, tail], ignore_index=True)
+
+    @property
+    def compact_report(self) -> dict | None:
+        """ Memory of the last compact load versus the default dtypes, in bytes """
+        return None if self._compact_schema is None else self._compact_schema.report
+
+    def _compact(self, df: pd.DataFrame, float32: bool) -> pd.DataFrame:
+        if self._compact_schema is None or self._compact_schema.float32 != float32:
+            self._compact_schema = CompactSchema.infer(df, float32=float32)
+        else:
+            self._compact_schema.extend(df)
+        return self._validate(self._compact_schema.apply(df))
+
+    def _missing_columns(self, df: pd.DataFrame, columns: list[str] | None) -> list[str]:
+        """ Columns needed for this request that the cached frame does not hold """
+        wanted = self.read_columns() if columns is None else columns
+        loaded = set(df.columns)
+        return [col for col in wanted if col not in loaded]
+
+    def _add_columns(self, key: tuple, df: pd.DataFrame, missing: list[str],
+                     compact: bool, float32: bool, event: dict) -> pd.DataFrame | None:
+        """
+        Parse only `missing` and merge them into the cached frame.
+
+        Returns None (forcing a full re-read) when the file changed since the
+        cached columns were read, so columns of two versions are never mixed.
+        """
+        disk_key, extra = self._read_from_disk(missing, event)
+        if disk_key != key[:len(disk_key)]:
+            return None
+        if compact:
+            extra = self._compact(extra, float32)
+        merged = pd.concat([df, extra], axis=1)
+        loaded = set(merged.columns)
+        merged = self._validate(merged[[col for col in self.read_columns() if col in loaded]])
+        self._cache.put(key, merged)
+        return merged
+
+    @property
+    def _cached_frames(self) -> list[pd.DataFrame]:
+        """ Every frame this handler loaded that the shared cache still holds (one per load variant) """
+        frames = (self._cache.peek(key) for key in tuple(self._cache_keys.values()))
+        return [df for df in frames if df is not None]
+
+    @property
+    def _data_cache(self) -> pd.DataFrame | None:
+        """ A frame this handler loaded, if it is still held by the shared cache """
+        for key in tuple(self._cache_keys.values()):
+            df = self._cache.peek(key)
+            if df is not None:
+                return df
+        return None
+
+    @property
+    def data_version(self) -> tuple:
+        """
+        Identity of the data a default `load_data()` returns: the cache key
+        (resolved path, size, mtime, schema, load variant) of the loaded file version.
+
+        It changes whenever a reload picks up a modified file, so results
+        derived from the data can be keyed on it.
+        """
+        variant = ('compact', False) if self.compact else ()
+        return self._cache_keys.get(variant) or self._make_cache_key(variant)
+
+    def extends_version(self, version: tuple, earlier: tuple) -> bool:
+        """ True when `version` was produced from `earlier` by append-only reloads """
+        while version in self._appended_from:
+            version = self._appended_from[version]
+            if version == earlier:
+                return True
+        return False
+
+    def _make_cache_key(self, variant: tuple = ()) -> tuple:
+        try:
+            return SharedDataFrameCache.make_key(self.file_path, *self._schema_key(), *variant)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"CSV file not found: {self.file_path}") from e
+
+    def _schema_key(self) -> tuple:
         """
-        if reload or self._data_cache is None:
+        Cache-key part naming the schema frames are validated against, so
+        handlers with different schemas (or none) never share an unvalidated frame.
+        """
+        schema = self.schema
+        return () if schema is None else ('schema', schema)
+
+    def _read_from_disk(self, columns: list[str] | None, event: dict) -> tuple[tuple, pd.DataFrame]:
+        """ Read the source file (or some columns), preferring a fresh sidecar over parsing the CSV """
+        # Key the frame by the version seen before reading so a concurrent rewrite is never masked
+        key = self._make_cache_key()
+        try:
+            if self._sidecar is not None and self._sidecar.is_fresh():
+                df = self._sidecar.read(columns)
+                event.update(source='sidecar', bytes_read=self._sidecar.path.stat().st_size)
+                return key, self._validate(df)
+
+            # Fingerprint before parsing so a write racing with the parse invalidates the sidecar
+            write_sidecar = self._sidecar is not None and columns is None
+            fingerprint = self._sidecar.fingerprint() if write_sidecar else None
+            df = pd.read_csv(self.file_path, usecols=columns)
+            event.update(source='csv', bytes_read=key[1])
+        except FileNotFoundError as e:
+            # Raise a clear error instead of returning None to avoid hidden NoneType issues downstream
+            raise FileNotFoundError(f"CSV file not found: {self.file_path}") from e
+
+        if columns is None:
+            self._header = list(df.columns)
+        if write_sidecar:
+            # Written as parsed, so handlers with another schema (or none) can read it too
+            self._sidecar.write(df, fingerprint)
+        return key, self._validate(df)
+
+    def read_columns(self) -> list[str]:
+        """ Column names of the dataset, read from the header without loading rows """
+        if self._header is None:
             try:
-                self._data_cache = pd.read_csv(self.file_path)
-                print(f"Data loaded from disk: {Path(self.file_path).resolve()}")
+                self._header = list(pd.read_csv(self.file_path, nrows=0).columns)
             except FileNotFoundError as e:
-                # Raise a clear error instead of returning None to avoid hidden NoneType issues downstream
                 raise FileNotFoundError(f"CSV file not found: {self.file_path}") from e
-        else:
-            # Using cached version
-            print("Using cached data.")
-        return self._data_cache.copy() if (copy and self._data_cache is not None) else self._data_cache
+        return self._header
+
+    def _reset_header(self):
+        self._header = None
+        self._schema, self._schema_resolved = None, False
+
+    @property
+    def schema(self) -> DatasetSchema | None:
+        """
+        The dataset schema, resolved and checked against the header once per file version.
+
+        Raises ValueError if an explicitly requested schema does not match
+        the header; with ``schema='auto'`` a header matching no registered
+        schema simply has none.
+        """
+        if not self._schema_resolved:
+            option = self._schema_option
+            schema = None
+            if option is not None:
+                header = self.read_columns()
+                schema = detect_schema(header) if option == 'auto' else \
+                    get_schema(option) if isinstance(option, str) else option
+                if schema is not None:
+                    schema.check_header(header)
+            self._schema, self._schema_resolved = schema, True
+        return self._schema
+
+    @property
+    def schema_validated(self) -> bool:
+        """ Whether the frame cached for this handler was validated and coerced by `schema` """
+        schema, df = self.schema, self._data_cache
+        return schema is not None and df is not None and schema.is_validated(df)
+
+    def _validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        schema = self.schema
+        return df if schema is None else schema.validate(df)
 
-    def invalidate_cache(self):
-        """Invalidate the current cached DataFrame forcing next load to hit disk."""
-        self._data_cache = None
+    def iter_chunks(self, chunksize: int = 100_000,
+                    columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the CSV as consecutive DataFrames of at most `chunksize` rows.
+
+        Parameters
+        ----------
+        chunksize : int, default 100_000
+            Maximum number of rows per yielded chunk; peak memory is bounded
+            by this rather than by the file size.
+        columns : sequence of str, optional
+            Parse only these columns (in this order). All columns by default.
+
+        Notes
+        -----
+        Chunks bypass the in-memory cache and the sidecar, and keep the row
+        index of the source file (chunk two starts at `chunksize`, and so on).
+        Each chunk is coerced by `schema` like a loaded frame.
+        """
+        if chunksize <= 0:
+            raise ValueError("Parameter 'chunksize' must be a positive integer.")
+        if columns is not None:
+            columns = list(columns)
+            missing_columns = [col for col in columns if col not in self.read_columns()]
+            if missing_columns:
+                raise ValueError(f"Columns not found in the dataset: {missing_columns}")
+        # Validate eagerly above; the generator below only starts parsing on first iteration
+        return self._generate_chunks(chunksize, columns)
+
+    def _generate_chunks(self, chunksize: int, columns: list[str] | None) -> Iterator[pd.DataFrame]:
+        try:
+            fh = open(self.file_path, 'rb')
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"CSV file not found: {self.file_path}") from e
+        position = 0
+        with fh, pd.read_csv(fh, chunksize=chunksize, usecols=columns) as reader:
+            while True:
+                started = time.perf_counter()
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                # The parser reads ahead in blocks, so bytes per chunk are approximate
+                self.instrumentation.record('chunk', self.file_path, time.perf_counter() - started,
+                                            source='csv', rows=len(chunk), columns=chunk.shape[1],
+                                            bytes_read=fh.tell() - position)
+                position = fh.tell()
+                yield self._validate(chunk if columns is None else chunk[columns])
+
+    def invalidate_cache(self, drop_sidecar: bool = False):
+        """
+        Invalidate the current cached DataFrame forcing next load to hit disk.
+
+        A sidecar that still matches the CSV is reused by the next load; pass
+        `drop_sidecar=True` to delete it as well and force a full CSV parse.
+        """
+        # Under the load lock, so an in-flight load never sees half-cleared state
+        with self._cache.lock(self.file_path):
+            for key in tuple(self._cache_keys.values()):
+                self._cache.discard(key)
+            self._cache_keys.clear()
+            self._trackers.clear()
+            self._appended_from.clear()
+            self._reset_header()
+        if drop_sidecar and self._sidecar is not None:
+            self._sidecar.remove()
+
+
+    def export_data(self, df: pd.DataFrame, output_path: str, compression: str | None = 'infer',
+                    format: str | None = None, chunksize: int | None = None,
+                    partitions: int | None = None, background: bool = False):
+        """
+        Export DataFrame to CSV file (or another format, see `DataExporter`)
+
+        The file is written to a temporary name and atomically renamed into
+        place. Compression and format follow the suffix by default
+        (``.csv.gz``, ``.csv.zst``, ``.npz``, ``.parquet``). With `partitions`
+        the frame is written as that many part files in parallel, and with
+        `background=True` the export runs in a background thread and a
+        future is returned; `wait_for_exports()` joins all of them.
+        """
+        options = dict(compression=compression, format=format, chunksize=chunksize, partitions=partitions)
+        if background:
+            return get_exporter().run_in_background(self._export, df, output_path, options)
+        return self._export(df, output_path, options)
 
+    def _export(self, df: pd.DataFrame, output_path: str, options: dict) -> Path:
+        with self.instrumentation.measure('export', output_path) as event:
+            out = get_exporter().export(df, output_path, **options)
+            event.update(source=options['format'] or DataExporter.infer_format(out), rows=len(df),
+                         columns=df.shape[1], bytes_written=DataExporter.written_bytes(out))
+        return out
 
-    def export_data(self, df: pd.DataFrame, output_path: str):
-        """ Export DataFrame to CSV file """
-        out = Path(output_path)
-        out.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(out, index=False)
-        print(f"Data exported to {out.resolve()}")
\ No newline at end of file
+    @staticmethod
+    def wait_for_exports() -> list[Path]:
+        """ Block until every background export has finished """
+        return get_exporter().wait()
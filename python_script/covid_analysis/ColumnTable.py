@@ -0,0 +1,149 @@
+from collections.abc import Hashable, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+
+from python_script.covid_analysis.GroupAggregator import GroupAggregator
+from python_script.covid_analysis.KeyIndex import KeyIndex
+from python_script.covid_analysis.SortedIndex import SortedIndex
+
+
+class ColumnTable:
+    """
+    A frame held as contiguous NumPy column arrays, for low-latency queries on small tables.
+
+    Numeric columns are kept as their own arrays. Every other column is
+    dictionary-encoded into integer codes (-1 for missing) over its sorted
+    distinct values; those columns can be grouped on and looked up by key.
+    Categorical columns reuse their existing codes.
+
+    Queries return row positions or small arrays. Results leave as plain
+    arrays (`arrays`) or, at the boundary, as a DataFrame (`frame`,
+    `group_sums`) with the dtypes and row labels of the source frame. On a
+    few hundred rows this skips the pandas index, groupby and alignment
+    machinery that dominates each call.
+
+    Key lookups, sorted orders and group sums reuse `KeyIndex`,
+    `SortedIndex` and `GroupAggregator`, each built on first use and kept
+    for the life of the table.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.columns = list(df.columns)
+        self.labels = df.index.to_numpy()
+        self.dtypes = df.dtypes.to_dict()
+        self.values: dict[str, np.ndarray] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        # Distinct values per encoded column, with a trailing NaN so code -1 decodes to missing
+        self.categories: dict[str, np.ndarray] = {}
+        self._key_indexes: dict[str, KeyIndex] = {}
+        self._sorted_indexes: dict[str, SortedIndex] = {}
+        self._aggregator = GroupAggregator(df)
+        for column in self.columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self._encode(column, series.cat.codes.to_numpy(), series.cat.categories.to_numpy())
+            elif self.is_numeric(column):
+                self.values[column] = series.to_numpy()
+            else:
+                try:
+                    codes, uniques = pd.factorize(series, sort=True)
+                except TypeError:
+                    # Mixed types that cannot be ordered; kept as an object column
+                    self.values[column] = series.to_numpy()
+                    continue
+                self._encode(column, codes, np.asarray(uniques, dtype=object))
+
+    def _encode(self, column: str, codes: np.ndarray, uniques: np.ndarray):
+        self.codes[column] = codes.astype(np.int32, copy=False)
+        self.categories[column] = np.append(uniques.astype(object), np.nan)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def is_numeric(self, column: str) -> bool:
+        """ Plain numeric NumPy column (not bool, categorical or an extension dtype) """
+        dtype = self.dtypes[column]
+        return is_numeric_dtype(dtype) and not is_bool_dtype(dtype) and isinstance(dtype, np.dtype)
+
+    def decode(self, column: str, positions: np.ndarray | slice = slice(None)):
+        """ The values of `column` at `positions`, in the source dtype """
+        if column in self.values:
+            return self.values[column][positions]
+        return self.decode_codes(column, self.codes[column][positions])
+
+    def arrays(self, positions: np.ndarray, columns: Sequence[str] | None = None) -> dict[str, np.ndarray]:
+        """ The rows at `positions` as one array per column, without building a DataFrame """
+        columns = self.columns if columns is None else columns
+        return {column: np.asarray(self.decode(column, positions)) for column in columns}
+
+    def frame(self, positions: np.ndarray, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """ The rows at `positions` as a DataFrame, like ``df.take(positions)[columns]`` """
+        # A block-wise take of the source frame is cheaper than assembling a frame from column arrays
+        rows = self.df.take(positions)
+        return rows if columns is None else rows[list(columns)]
+
+    # -- row selections (positions in file order unless stated otherwise) ---------------------
+
+    def greater_than(self, column: str, threshold) -> np.ndarray:
+        return np.flatnonzero(self.values[column] > threshold)
+
+    def equal_to(self, column: str, value) -> np.ndarray:
+        return np.flatnonzero(self.values[column] == value)
+
+    def outside(self, column: str, lower, upper) -> np.ndarray:
+        values = self.values[column]
+        return np.flatnonzero((values < lower) | (values > upper))
+
+    def sorted_index(self, column: str) -> SortedIndex:
+        """ The `SortedIndex` of a numeric column, built on first use """
+        if column not in self._sorted_indexes:
+            self._sorted_indexes[column] = SortedIndex(self.values[column])
+        return self._sorted_indexes[column]
+
+    def ordered(self, column: str, ascending: bool = True) -> np.ndarray:
+        """ Positions in stable sorted order; ties keep file order, missing values come last """
+        return self.sorted_index(column).ordered(ascending)
+
+    def top_n(self, column: str, n: int, ascending: bool = False) -> np.ndarray:
+        """ Positions of the `n` first rows by `column` like `nlargest`/`nsmallest`: missing values never selected """
+        index = self.sorted_index(column)
+        return index.ordered(ascending)[:min(n, index.valid)]
+
+    def lookup(self, column: str, keys: Hashable | Iterable[Hashable]) -> np.ndarray:
+        """ Positions of rows whose encoded `column` holds any of `keys`, in file order """
+        if column not in self._key_indexes:
+            self._key_indexes[column] = KeyIndex(self.df[column])
+        return self._key_indexes[column].positions(keys)
+
+    # -- aggregation ---------------------------------------------------------------------------
+
+    def group_sums(self, group_by_columns: Sequence[str], value_columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Same result as ``df.groupby(group_by_columns, observed=True)[value_columns].sum().reset_index()``.
+
+        The groups and sums come from the table's `GroupAggregator`, so the
+        key factorization and each column's sums are computed once and
+        reused by later calls. Integer columns sum to int64.
+        """
+        by = tuple(group_by_columns)
+        _, key_rows = self._aggregator.group_keys(by)
+        data = {column: key_rows[column].array for column in by}
+        for column in value_columns:
+            sums, _ = self._aggregator._sum(by, column)
+            # Copies, so callers cannot change the cached sums
+            data[column] = sums.astype(np.int64) if is_integer_dtype(self.dtypes[column]) else sums.copy()
+        return pd.DataFrame(data, copy=False)
+
+    def decode_codes(self, column: str, codes: np.ndarray):
+        """ Values of the encoded `column` for the given codes """
+        dtype = self.dtypes[column]
+        if isinstance(dtype, pd.CategoricalDtype):
+            return pd.Categorical.from_codes(codes, dtype=dtype)
+        return self.categories[column][codes]
+
+    def groupable(self, columns: Sequence[str]) -> bool:
+        """ Whether `columns` can be grouped on codes (every one is dictionary-encoded) """
+        return all(column in self.codes for column in columns)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+SIGNED_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+class CompactSchema:
+    """
+    Memory-compact dtypes for a dataset, inferred once and re-applied on load.
+
+    * string columns whose distinct-value ratio is at most `category_threshold`
+      are dictionary-encoded as ``category`` (e.g. ``WHO Region``),
+    * integer (count) columns are stored in the narrowest signed width that
+      holds their observed range,
+    * float (rate) columns are optionally stored as ``float32``.
+
+    Integer widths are re-checked on every `apply`, so a column that outgrows
+    its inferred width (after the CSV gained rows) is widened instead of
+    wrapping around. Signed widths are used so that differences of counts
+    (e.g. ``New cases``) never underflow.
+
+    Notes
+    -----
+    Arithmetic between two narrow integer columns keeps the narrow width in
+    NumPy/pandas; cast to ``int64`` first if such a result may overflow.
+    Aggregations (`sum`, `mean`, groupby sums) and ratios are unaffected.
+    """
+
+    def __init__(self, dtypes: dict[str, str], float32: bool = False,
+                 category_threshold: float = DEFAULT_CATEGORY_THRESHOLD, inferred_columns=()):
+        self.dtypes = dtypes
+        self.float32 = float32
+        self.category_threshold = category_threshold
+        # Columns already inspected, including those that keep pandas' default dtype
+        self.inferred_columns = set(inferred_columns)
+        self.report: dict | None = None
+
+    @classmethod
+    def infer(cls, df: pd.DataFrame, category_threshold: float = DEFAULT_CATEGORY_THRESHOLD,
+              float32: bool = False) -> 'CompactSchema':
+        """ Infer compact dtypes from a frame loaded with pandas' default dtypes """
+        dtypes = {}
+        rows = max(len(df), 1)
+        for name, series in df.items():
+            if series.dtype == object:
+                if series.nunique(dropna=True) / rows <= category_threshold:
+                    dtypes[name] = 'category'
+            elif pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                dtypes[name] = cls._narrowest_int(series)
+            elif float32 and pd.api.types.is_float_dtype(series.dtype):
+                dtypes[name] = 'float32'
+        return cls(dtypes, float32=float32, category_threshold=category_threshold,
+                   inferred_columns=df.columns)
+
+    def extend(self, df: pd.DataFrame):
+        """ Infer dtypes for columns of `df` not seen before (e.g. a later column projection) """
+        new_columns = [col for col in df.columns if col not in self.inferred_columns]
+        if new_columns:
+            extra = self.infer(df[new_columns], self.category_threshold, self.float32)
+            self.dtypes.update(extra.dtypes)
+            self.inferred_columns.update(new_columns)
+
+    @property
+    def category_columns(self) -> list[str]:
+        return [name for name, dtype in self.dtypes.items() if dtype == 'category']
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return `df` cast to the compact dtypes and record the memory saved.
+
+        `report` is updated with the deep memory of the frame before and
+        after compaction, in bytes.
+        """
+        before = int(df.memory_usage(index=True, deep=True).sum())
+        casts = {}
+        for name, dtype in self.dtypes.items():
+            if name not in df.columns:
+                continue
+            series = df[name]
+            if dtype.startswith('int'):
+                if not pd.api.types.is_integer_dtype(series.dtype):
+                    continue  # the column gained missing values; leave pandas' float dtype alone
+                dtype = self._widest(dtype, self._narrowest_int(series))
+                self.dtypes[name] = dtype
+            if series.dtype != dtype:
+                casts[name] = dtype
+        compact = df.astype(casts) if casts else df
+        after = int(compact.memory_usage(index=True, deep=True).sum())
+        self.report = {
+            'default_bytes': before,
+            'compact_bytes': after,
+            'saved_bytes': before - after,
+            'saved_pct': round(100 * (before - after) / before, 2) if before else 0.0,
+        }
+        return compact
+
+    @staticmethod
+    def _narrowest_int(series: pd.Series) -> str:
+        if series.empty:
+            return 'int64'
+        low, high = series.min(), series.max()
+        for dtype in SIGNED_INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(dtype).name
+        return 'int64'
+
+    @staticmethod
+    def _widest(*dtypes: str) -> str:
+        return max(dtypes, key=lambda name: np.dtype(name).itemsize)
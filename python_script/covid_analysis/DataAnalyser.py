@@ -1,124 +1,464 @@
-from collections.abc import Sequence
+from collections.abc import Hashable, Iterator, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
 from python_script.covid_analysis.CSVHandler import CSVHandler
+from python_script.covid_analysis.GroupAggregator import GroupAggregator
+from python_script.covid_analysis.KeyIndex import KeyIndex
+from python_script.covid_analysis.LazyQuery import LazyQuery
+from python_script.covid_analysis.ParallelGroupBy import ParallelGroupBy
+from python_script.covid_analysis.QuantileSketch import DEFAULT_QUANTILE_ERROR, QuantileSketch
+from python_script.covid_analysis.QueryMemo import DEFAULT_MEMO_BYTES, DEFAULT_MEMO_SIZE, QueryMemo, memoized
+from python_script.covid_analysis.RunningStats import RunningStats
+from python_script.covid_analysis.SortedIndex import SortedIndex
 
 class DataAnalyzer(CSVHandler):
-    def __init__(self, file_path):
-        super().__init__(file_path)
+    # Derived ratio columns: name -> (numerator, denominator, scale), computed as
+    # scale * numerator / denominator (NaN where the denominator is 0)
+    derived_columns: dict[str, tuple[str, str, float]] = {
+        'Mortality Rate': ('Deaths', 'Confirmed', 100),
+        'Recovery Rate': ('Recovered', 'Confirmed', 100),
+    }
 
-    def summarize_data(self, column_name: str='WHO Region', sort_by: str='Confirmed'):
-        """ 1. Display total confirmed, death, and recovered cases for each region."""
-        df  = self.load_data()
+    def __init__(self, file_path, memo_size: int = DEFAULT_MEMO_SIZE, workers: int | None = 1,
+                 memo_bytes: int | None = DEFAULT_MEMO_BYTES, **handler_options):
+        """
+        Query methods are memoized on their arguments and `data_version` (see
+        `QueryMemo`): repeating a query on unchanged data returns the stored
+        result, whose values are read-only -- `.copy()` it before mutating.
+        The memo holds at most `memo_size` results and `memo_bytes` bytes
+        (None for no byte limit); pass `memo_size=0` to disable memoization.
+
+        `workers` > 1 (or None for one per CPU) runs the group sums of
+        `summarize_data` and `group_data` on row partitions in a process pool
+        (see `ParallelGroupBy`); inputs below `parallel.min_rows` rows and
+        object (string) keys stay serial, so load with ``compact=True`` to get
+        categorical keys.
+        """
+        super().__init__(file_path, **handler_options)
+        self._memo = QueryMemo(memo_size, memo_bytes)
+        self.parallel = ParallelGroupBy(workers)
+        # Secondary indexes per (index type, column), each tagged with the data version it was built on
+        self._indexes: dict[tuple[type, str], tuple[tuple, SortedIndex | KeyIndex]] = {}
+        # Derived columns (read-only arrays) with the data version they were computed on
+        self._derived: dict[str, tuple[tuple, pd.Series]] = {}
+        # Running statistics per column with the data version and row count they cover
+        self._running_stats: dict[str, tuple[tuple, int, RunningStats]] = {}
+
+    @memoized
+    def summarize_data(self, column_name: str='WHO Region', sort_by: str='Confirmed',
+                       chunksize: int | None = None):
+        """ 1. Display total confirmed, death, and recovered cases for each region.
 
+        With `chunksize` set, the CSV is streamed and per-chunk group sums are
+        merged, so memory is bounded by the chunk size instead of the file.
+        """
         required_columns = ['Confirmed', 'Deaths', 'Recovered']
-        for column in required_columns:
-            if column not in df.columns:
-                raise ValueError(f"Column '{column}' not found in the dataset.")
+
+        if chunksize is not None:
+            self._require_columns(required_columns)
+            summary = self._streamed_group_sums([column_name], required_columns, chunksize)
+            return summary.reset_index().sort_values(by=sort_by, ascending=False)
+
+        df  = self._load_columns([column_name] + required_columns)
 
         # dynamically pass column name to groupby function
         return (
-            df.groupby(column_name)[required_columns]
-                .sum()
+            self.parallel.group_sums(df, [column_name], required_columns)
                 .reset_index()
                 .sort_values(by=sort_by, ascending=False)
         )
 
-    def filter_data(self, column_name='Confirmed', threshold=10):
-        """ 2. Exclude entries where confirmed cases are < 10."""
+    @memoized
+    def filter_data(self, column_name='Confirmed', threshold=10, chunksize: int | None = None):
+        """ 2. Exclude entries where confirmed cases are < 10.
+
+        With `chunksize` set, returns an iterator that yields the filtered rows
+        of each streamed chunk instead of a single DataFrame.
+        """
+        self._require_columns([column_name])
+        if chunksize is not None:
+            return self._streamed_filter(column_name, threshold, chunksize)
+
         df  = self.load_data()
-        if column_name not in df.columns:
-            raise ValueError(f"Column '{column_name}' not found in the dataset.")
 
+        index = self._sorted_index(df, column_name)
+        if index is not None:
+            return df.take(index.greater_than(threshold))
         return df[df[column_name] > threshold] 
     
+    @memoized
     def sort_data(self, column_name='Confirmed', ascending=True):
         """ 4. Sort Data by Confirmed Cases and Save sorted dataset into a new CSV file."""
+        self._require_columns([column_name])
         df  = self.load_data()
-        if column_name not in df.columns:
-            raise ValueError(f"Column '{column_name}' not found in the dataset.")
 
+        index = self._sorted_index(df, column_name)
+        if index is not None:
+            return df.take(index.ordered(ascending))
         return df.sort_values(by=column_name, ascending=ascending)
         
 
-    def get_top_n(self, n=5, column_name='Confirmed'):
-        """ 5. Top 5 Countries by Case Count """
-        df  = self.load_data()
-        return df.sort_values(by=column_name, ascending=False).head(n)
-    
-    def get_bottom_n(self, n=5, column_name='Deaths'):
-        """ 6. Region with Lowest Death Count """
-        df  = self.load_data()
-        return df.sort_values(column_name, ascending=True).head(n)
-    
+    @memoized
+    def get_top_n(self, n=5, column_name: str | Sequence[str]='Confirmed',
+                  per_group: str | Sequence[str] | None = None):
+        """ 5. Top 5 Countries by Case Count
+
+        `column_name` may list several ranking columns; later ones break ties
+        in earlier ones. With `per_group` (e.g. ``'WHO Region'``), the top `n`
+        rows of every group are returned, ordered by group then rank.
+        """
+        return self._select_n(n, column_name, ascending=False, per_group=per_group)
+
+    @memoized
+    def get_bottom_n(self, n=5, column_name: str | Sequence[str]='Deaths',
+                     per_group: str | Sequence[str] | None = None):
+        """ 6. Region with Lowest Death Count
+
+        Accepts several ranking columns and `per_group` like `get_top_n`.
+        """
+        return self._select_n(n, column_name, ascending=True, per_group=per_group)
+
+    @memoized
     def calculate_mortality_recovery_rates(self, sort_by_column='Mortality Rate', ascending=False):
         """ Calculate both Mortality and Recovery Rates by Region """
-        df  = self.load_data(copy=True)
-
         required_columns = ['Country/Region', 'WHO Region', 'Confirmed', 'Deaths', 'Recovered', 'Mortality Rate', 'Recovery Rate']
-        for column in required_columns:
-            # Check if columns exist in the DataFrame and 'Mortality Rate', 'Recovery Rate' are new columns to be created
-            if column not in df.columns and column not in ['Mortality Rate', 'Recovery Rate']:
-                raise ValueError(f"Column '{column}' not found in the dataset.")
+        # The rates are derived columns, computed once per data version; only the sort runs per call
+        df  = self.load_with_derived(required_columns)
 
-        df.loc[:, 'Mortality Rate'] = (df['Deaths'] / df['Confirmed']) * 100
-        df.loc[:, 'Recovery Rate'] = (df['Recovered'] / df['Confirmed']) * 100
+        return df.sort_values(by=sort_by_column, ascending=ascending)
 
-        return (
-            df[required_columns]
-            .sort_values(by=sort_by_column, ascending=ascending)
-        )
 
+    @memoized
+    def detect_outliers(self, column_name='Confirmed', z: float = 2.0, chunksize: int | None = None):
+        """ 10. Detect Outliers in Case Counts and Use mean ± 2*std deviation.
 
-    def detect_outliers(self, column_name='Confirmed', z: float = 2.0):
-        """ 10. Detect Outliers in Case Counts and Use mean ± 2*std deviation."""
-        df  = self.load_data()
+        With `chunksize` set, the CSV is streamed twice: the first pass merges
+        per-chunk mean/variance, the second collects rows outside the bounds.
+        """
+        self._require_columns([column_name])
+        if chunksize is not None:
+            return self._streamed_outliers(column_name, z, chunksize)
 
-        if column_name not in df.columns:
-            raise ValueError(f"Column '{column_name}' not found in the dataset.")
+        df  = self.load_data()
 
+        if SortedIndex.supports(df[column_name]):
+            lower_bound, upper_bound = self.column_stats(column_name).bounds(z)
+        else:
+            mean = df[column_name].mean()
+            std_dev = df[column_name].std()
+            lower_bound = mean - z * std_dev
+            upper_bound = mean + z * std_dev
+        index = self._sorted_index(df, column_name)
+        if index is not None:
+            return df.take(index.outside(lower_bound, upper_bound))
         col = df[column_name].astype(float)
-        mean = df[column_name].mean()
-        std_dev = df[column_name].std()
-        lower_bound = mean - z * std_dev
-        upper_bound = mean + z * std_dev
         outliers = df[(col < lower_bound) | (col > upper_bound)]
         return outliers
     
 
-    def group_data(self, group_by_columns: Sequence[str], ascending=False):
-        """ Group Data by Country and Region """
-        df  = self.load_data()
+    @memoized
+    def group_data(self, group_by_columns: Sequence[str], ascending=False, chunksize: int | None = None):
+        """ Group Data by Country and Region
 
-        for column in group_by_columns:
-            if column not in df.columns:
-                raise ValueError(f"Column '{column}' not found in the dataset.")
+        With `chunksize` set, per-chunk group sums are merged while streaming.
+        """
+        if chunksize is not None:
+            self._require_columns(group_by_columns)
+            grouped = self._streamed_group_sums(list(group_by_columns),
+                                                ['Confirmed', 'Deaths', 'Recovered'], chunksize)
+            return grouped.sort_values(by='Confirmed', ascending=ascending).reset_index()
+
+        df  = self._load_columns(list(group_by_columns) + ['Confirmed', 'Deaths', 'Recovered'])
 
         group_data = (
-            df.groupby(group_by_columns)[['Confirmed', 'Deaths', 'Recovered']]
-            .sum()
+            self.parallel.group_sums(df, group_by_columns, ['Confirmed', 'Deaths', 'Recovered'])
             .sort_values(by='Confirmed', ascending=ascending)
             .reset_index()
         )
 
         return group_data
 
+    def query(self) -> LazyQuery:
+        """ Start a lazy query (see `LazyQuery`): chain steps, then `.collect()` or `.explain()` """
+        return LazyQuery(self)
+
+    @memoized
+    def aggregate(self, specs: Mapping[str, Mapping]) -> dict[str, pd.DataFrame]:
+        """ Compute several group-by reports in one pass over the data
+
+        `specs` maps a report name to a spec dict (see `GroupAggregator`), e.g.::
+
+            analyzer.aggregate({
+                'regions': {'by': 'WHO Region', 'sum': ['Confirmed', 'Deaths', 'Recovered'],
+                            'sort_by': 'Confirmed', 'ascending': False},
+                'rates': {'by': ['WHO Region', 'Country/Region'], 'count': True,
+                          'ratio': {'Mortality Rate': ('Deaths', 'Confirmed', 100)},
+                          'quantile': {'Confirmed': [0.25, 0.75]}},
+            })
+
+        Only the columns the specs read are loaded, once, and key columns
+        shared between reports are factorized once. Returns the result frames
+        by report name.
+        """
+        columns = GroupAggregator.required_columns(specs)
+        df  = self._load_columns(columns)
+        return GroupAggregator(df).run(specs)
+
+    @memoized
     def identify_zero_recovered(self, column_name:str='Recovered'):
         """ Identify Regions with Zero Recovered Cases """
+        self._require_columns([column_name])
         df  = self.load_data()
-        if column_name not in df.columns:
-            raise ValueError(f"Column '{column_name}' not found in the dataset.")
 
+        index = self._sorted_index(df, column_name)
+        if index is not None:
+            return df.take(index.equal_to(0))
         zero_recovered =  df[df[column_name] == 0]
         return zero_recovered
 
+    @memoized
     def fetch_data_by_country_by_column(self, country_names: Sequence[str],
                                         column_names: Sequence[str],
                                         filter_by: str='Country/Region'):
         """ Fetch data for a specific country """
+        df  = self._load_columns([filter_by] + list(column_names))
+
+        positions = self._key_index(df, filter_by).positions(country_names)
+        data_based_on_country = df.take(positions)[list(column_names)]
+        return data_based_on_country
+
+    def lookup(self, keys: Hashable | Sequence[Hashable], key_column: str='Country/Region') -> pd.DataFrame:
+        """
+        Rows whose `key_column` equals `keys` (one key or a batch), in file order.
+
+        Served from a hash index on `key_column` that is built once per data
+        version, so each call costs O(number of keys) instead of a scan.
+        """
         df  = self.load_data()
+        self._require_columns([key_column])
+        return df.take(self._key_index(df, key_column).positions(keys))
+
+    def invalidate_cache(self, drop_sidecar: bool = False):
+        """ Invalidate the cached DataFrame and every memoized query result """
+        super().invalidate_cache(drop_sidecar=drop_sidecar)
+        self._memo.clear()
+        self._indexes.clear()
+        self._derived.clear()
+        self._running_stats.clear()
+
+    @property
+    def memo_stats(self) -> dict:
+        """ Entries, hits and misses of the query memo """
+        return self._memo.stats()
+
+    def add_derived_column(self, name: str, numerator: str, denominator: str, scale: float = 1.0):
+        """
+        Declare ``scale * numerator / denominator`` as derived column `name` on this analyzer.
+
+        Memoized results may have been computed from an earlier declaration
+        of `name`, so the memo is cleared.
+        """
+        self.derived_columns = {**self.derived_columns, name: (numerator, denominator, scale)}
+        self._derived.pop(name, None)
+        self._memo.clear()
+
+    def derived_column(self, name: str) -> pd.Series:
+        """
+        A declared derived column (see `derived_columns`), computed once per data version.
+
+        The ratio is vectorized with NaN where the denominator is 0. The
+        returned Series is backed by a read-only array shared by every
+        caller: `.copy()` it before writing to it.
+        """
+        if name not in self.derived_columns:
+            raise ValueError(f"Derived column '{name}' is not declared.")
+        numerator, denominator, scale = self.derived_columns[name]
+        df  = self._load_columns([numerator, denominator])
+        version = self.data_version
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        top = df[numerator].to_numpy(dtype=float, na_value=np.nan)
+        bottom = df[denominator].to_numpy(dtype=float, na_value=np.nan)
+        values = np.divide(top, bottom, out=np.full(len(df), np.nan), where=bottom != 0) * scale
+        values.flags.writeable = False
+        series = pd.Series(values, index=df.index, name=name, copy=False)
+        self._derived[name] = (version, series)
+        return series
+
+    def load_with_derived(self, columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Load `columns`, any of which may be derived columns, without copying.
+
+        The frame is assembled from the cached base columns and the cached
+        derived arrays, so it shares memory with both: treat it as read-only.
+        """
+        columns = list(dict.fromkeys(columns))
+        base  = self._load_columns([col for col in columns if col not in self.derived_columns])
+        data = {col: self.derived_column(col) if col in self.derived_columns else base[col] for col in columns}
+        return pd.DataFrame(data, index=base.index, copy=False)
+
+    def column_stats(self, column_name: str='Confirmed') -> RunningStats:
+        """
+        Count, mean, variance, min and max of a numeric column (see `RunningStats`).
+
+        Computed once per data version. After an append-only reload
+        (``load_data(reload=True, incremental=True)``) only the appended rows
+        are folded in, so the statistics never rescan the earlier rows.
+        """
+        df  = self._load_columns([column_name])
+        if not SortedIndex.supports(df[column_name]):
+            raise TypeError(f"Column '{column_name}' is not numeric.")
+        version = self.data_version
+        cached = self._running_stats.get(column_name)
+        if cached is not None and cached[0] == version:
+            return cached[2]
+        if cached is not None and cached[1] <= len(df) and self.extends_version(version, cached[0]):
+            stats = cached[2].merge(RunningStats.from_values(df[column_name].iloc[cached[1]:]))
+        else:
+            stats = RunningStats.from_values(df[column_name])
+        self._running_stats[column_name] = (version, len(df), stats)
+        return stats
+
+    def quantile_sketch(self, column_name: str='Confirmed', error: float = DEFAULT_QUANTILE_ERROR,
+                        chunksize: int | None = None) -> QuantileSketch:
+        """
+        Mergeable approximate-quantile sketch of a numeric column (see `QuantileSketch`).
+
+        With `chunksize` set, the CSV is streamed into the sketch one chunk at
+        a time, so memory is bounded by the chunk size and the sketch size
+        instead of the column. Sketches of other partitions (files, workers)
+        can be combined with `merge`.
+        """
+        if chunksize is not None:
+            self._require_columns([column_name])
+            sketch = QuantileSketch(error)
+            for chunk in self.iter_chunks(chunksize, columns=[column_name]):
+                sketch.update(chunk[column_name])
+            return sketch
+        df  = self._load_columns([column_name])
+        return QuantileSketch.from_values(df[column_name], error)
+
+    def iqr_bounds(self, column_name: str='Confirmed', factor: float = 1.5,
+                   error: float = DEFAULT_QUANTILE_ERROR, chunksize: int | None = None) -> tuple[float, float]:
+        """ ``(Q1 - factor * IQR, Q3 + factor * IQR)`` from an approximate quantile sketch """
+        q1, q3 = self.quantile_sketch(column_name, error, chunksize).quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return float(q1 - factor * iqr), float(q3 + factor * iqr)
+
+    def _load_columns(self, columns: Sequence[str], copy: bool = False) -> pd.DataFrame:
+        """
+        Load only the columns a query declares it needs.
 
-        for column in column_names:
-            if column not in df.columns:
+        The declaration is pushed down to `load_data(columns=...)`, so only
+        these columns are parsed (or fetched from the column-aware cache).
+        """
+        columns = list(dict.fromkeys(columns))
+        self._require_columns(columns)
+        return self.load_data(columns=columns, copy=copy)
+
+    def _sorted_index(self, df: pd.DataFrame, column_name: str) -> SortedIndex | None:
+        """
+        The presorted index of `column_name` for the loaded `df`, built on first use.
+
+        Indexes are reused while `data_version` is unchanged and rebuilt after
+        a reload picks up a new file version. Returns None for columns that
+        cannot be indexed (strings, categoricals, booleans), so callers fall
+        back to a scan.
+        """
+        if not SortedIndex.supports(df[column_name]):
+            return None
+        return self._cached_index(SortedIndex, column_name, lambda: SortedIndex(df[column_name].to_numpy()))
+
+    def _key_index(self, df: pd.DataFrame, column_name: str) -> KeyIndex:
+        """ The hash index of `column_name` for the loaded `df`, built once per data version """
+        return self._cached_index(KeyIndex, column_name, lambda: KeyIndex(df[column_name]))
+
+    def _cached_index(self, index_type: type, column_name: str, build):
+        version = self.data_version
+        cached = self._indexes.get((index_type, column_name))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = build()
+        self._indexes[(index_type, column_name)] = (version, index)
+        return index
+
+    def _select_n(self, n: int, column_name: str | Sequence[str], ascending: bool,
+                  per_group: str | Sequence[str] | None) -> pd.DataFrame:
+        """
+        The `n` first rows by `column_name` without sorting the whole frame.
+
+        Numeric ranking columns use partial selection (`nlargest`/`nsmallest`,
+        O(n) instead of O(n log n)); ties keep file order and rows with a
+        missing ranking value are never selected. Other dtypes fall back to a
+        sort. Per-group selection is one stable sort plus `groupby().head(n)`,
+        with no Python loop over groups.
+        """
+        columns = [column_name] if isinstance(column_name, str) else list(column_name)
+        group_columns = [] if per_group is None else [per_group] if isinstance(per_group, str) else list(per_group)
+        df  = self.load_data()
+        self._require_columns(columns + group_columns)
+
+        if group_columns:
+            ranked = df.sort_values(by=columns, ascending=ascending, kind='stable')
+            top = ranked.groupby(group_columns, observed=True, sort=False).head(n)
+            return top.sort_values(by=group_columns, kind='stable')
+
+        if all(is_numeric_dtype(df[col]) and not is_bool_dtype(df[col]) for col in columns):
+            return df.nsmallest(n, columns) if ascending else df.nlargest(n, columns)
+        return df.sort_values(by=columns, ascending=ascending).head(n)
+
+    def _require_columns(self, columns: Sequence[str]):
+        """
+        Raise ValueError for the first of `columns` missing from the dataset.
+
+        Columns declared by the handler's `schema` were checked against the
+        header once for this file version, so they pass without a scan.
+        """
+        schema = self.schema
+        if schema is not None and schema.column_set.issuperset(columns):
+            return
+        self._check_columns(self.read_columns(), columns)
+
+    @staticmethod
+    def _check_columns(available: Sequence[str], columns: Sequence[str]):
+        """ Raise ValueError for the first column missing from `available` """
+        for column in columns:
+            if column not in available:
                 raise ValueError(f"Column '{column}' not found in the dataset.")
 
-        data_based_on_country = df.loc[df[filter_by].isin(country_names), column_names]
-        return data_based_on_country
+    def _streamed_group_sums(self, group_by_columns: list[str], value_columns: list[str],
+                             chunksize: int) -> pd.DataFrame:
+        """ Group sums over the streamed CSV, merging partials after every chunk """
+        merged = None
+        levels = list(range(len(group_by_columns)))
+        for chunk in self.iter_chunks(chunksize, columns=group_by_columns + value_columns):
+            partial = self.parallel.group_sums(chunk, group_by_columns, value_columns)
+            # The merged partial holds one row per group, so it stays small however long the file is
+            merged = partial if merged is None else pd.concat([merged, partial]).groupby(level=levels).sum()
+        if merged is None:
+            return pd.DataFrame(columns=group_by_columns + value_columns).set_index(group_by_columns)
+        return merged
+
+    def _streamed_filter(self, column_name: str, threshold, chunksize: int) -> Iterator[pd.DataFrame]:
+        for chunk in self.iter_chunks(chunksize):
+            yield chunk[chunk[column_name] > threshold]
+
+    def _streamed_outliers(self, column_name: str, z: float, chunksize: int) -> pd.DataFrame:
+        # Pass 1: fold every chunk into running mean/variance statistics
+        stats = RunningStats()
+        for chunk in self.iter_chunks(chunksize, columns=[column_name]):
+            stats.update(chunk[column_name])
+        lower_bound, upper_bound = stats.bounds(z)
+
+        # Pass 2: keep only the rows outside the bounds
+        outliers = []
+        for chunk in self.iter_chunks(chunksize):
+            col = chunk[column_name].astype(float)
+            outliers.append(chunk[(col < lower_bound) | (col > upper_bound)])
+        if not outliers:
+            return pd.DataFrame(columns=self.read_columns())
+        return pd.concat(outliers)
@@ -0,0 +1,213 @@
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from python_script.covid_analysis.SidecarCache import SidecarCache
+
+EXPORT_FORMATS = ('csv', 'npz', 'parquet', 'feather')
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd', '.bz2': 'bz2', '.xz': 'xz'}
+FORMAT_SUFFIXES = {'.npz': 'npz', '.parquet': 'parquet', '.feather': 'feather'}
+DEFAULT_CSV_CHUNKSIZE = 100_000
+DEFAULT_BACKGROUND_WORKERS = 2
+
+
+class DataExporter:
+    """
+    Atomic, optionally compressed and parallel DataFrame export.
+
+    Every export is written to a temporary file in the destination directory
+    and renamed over the target only once it is complete, so a job that dies
+    mid-write never leaves a truncated file behind (the previous file, if
+    any, stays intact).
+
+    Supported formats are ``csv`` (optionally ``gzip``/``zstd``/``bz2``/``xz``
+    compressed), ``npz`` (the pickle-free columnar layout of `SidecarCache`)
+    and, when pyarrow is installed, ``parquet`` and ``feather``. Format and
+    compression are inferred from the file suffix unless given explicitly.
+
+    Large CSV exports can be split into `partitions` files written in
+    parallel into a directory (``part-00000.csv.gz`` ...), which replaces a
+    previous export only once complete, and `submit` runs
+    exports in a background thread pool while the pipeline continues.
+
+    Notes
+    -----
+    Background exports read `df` while the caller carries on; do not mutate
+    it in-place until the returned future has completed.
+    """
+
+    def __init__(self, background_workers: int = DEFAULT_BACKGROUND_WORKERS):
+        self._background_workers = background_workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: list[Future] = []
+        self._lock = threading.Lock()
+
+    def export(self, df: pd.DataFrame, output_path: str | Path, format: str | None = None,
+               compression: str | None = 'infer', chunksize: int | None = None,
+               partitions: int | None = None) -> Path:
+        """
+        Export `df` to `output_path` atomically and return the final path.
+
+        Parameters
+        ----------
+        format : {'csv', 'npz', 'parquet', 'feather'}, optional
+            Inferred from the suffix (``.csv.gz`` is csv); csv otherwise.
+        compression : str or None, default 'infer'
+            CSV compression; 'infer' uses the suffix (``.gz``, ``.zst``, ...).
+        chunksize : int, optional
+            Rows formatted per batch when writing CSV, bounding the memory of
+            the text being built. Defaults to 100_000.
+        partitions : int, optional
+            Split the frame into this many row ranges written concurrently as
+            ``part-NNNNN`` files inside the `output_path` directory. The parts
+            are written into a temporary directory that only replaces
+            `output_path` once every part is complete. The replacement takes
+            two renames (see `_swap_directory`), so it is not atomic.
+        """
+        out = Path(output_path)
+        format = format or self.infer_format(out)
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{format}'. Choose from {EXPORT_FORMATS}.")
+        if compression == 'infer':
+            compression = COMPRESSION_SUFFIXES.get(out.suffix) if format == 'csv' else None
+        if compression == 'zstd':
+            self._require_zstd()
+        out.parent.mkdir(parents=True, exist_ok=True)
+
+        if partitions is not None and partitions > 1:
+            self._export_partitioned(df, out, format, compression, chunksize, partitions)
+        else:
+            self._atomic_write(out, lambda tmp: self._write(df, tmp, format, compression, chunksize))
+        return out
+
+    def submit(self, df: pd.DataFrame, output_path: str | Path, **options) -> Future:
+        """ Run `export` in the background pool; returns a future resolving to the output path """
+        return self.run_in_background(self.export, df, output_path, **options)
+
+    def run_in_background(self, fn, *args, **kwargs) -> Future:
+        """ Run any export callable in the background pool, tracked by `wait` """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._background_workers,
+                                                thread_name_prefix='export')
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._pending.append(future)
+        return future
+
+    @staticmethod
+    def written_bytes(out: Path) -> int:
+        """ Size of an export on disk (summed over part files for partitioned exports) """
+        if out.is_dir():
+            return sum(part.stat().st_size for part in out.iterdir() if part.is_file())
+        return out.stat().st_size
+
+    def wait(self) -> list[Path]:
+        """ Block until every background export finished; re-raises the first failure """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return [future.result() for future in pending]
+
+    @staticmethod
+    def infer_format(out: Path) -> str:
+        return FORMAT_SUFFIXES.get(out.suffix, 'csv')
+
+    @staticmethod
+    def _require_zstd():
+        try:
+            import zstandard  # noqa: F401  (pandas' zstd backend)
+        except ImportError as e:
+            raise ImportError("zstd compression requires the 'zstandard' package.") from e
+
+    @staticmethod
+    def _write(df: pd.DataFrame, path: Path, format: str, compression: str | None, chunksize: int | None):
+        if format == 'csv':
+            df.to_csv(path, index=False, compression=compression,
+                      chunksize=chunksize or DEFAULT_CSV_CHUNKSIZE)
+        elif format == 'npz':
+            with open(path, 'wb') as fh:
+                np.savez(fh, **SidecarCache.encode_frame(df))
+        elif format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(path)
+
+    @staticmethod
+    def _atomic_write(out: Path, write):
+        """ Call `write(tmp_path)` then rename the temporary file over `out` """
+        tmp_path = DataExporter._temporary_path(out)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, out)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _temporary_path(out: Path) -> Path:
+        # Not tempfile.mkstemp/mkdtemp: those create owner-only files, while exports keep the umask
+        return out.with_name(f".{out.name}.{uuid.uuid4().hex}.tmp")
+
+    def _export_partitioned(self, df: pd.DataFrame, out: Path, format: str, compression: str | None,
+                            chunksize: int | None, partitions: int):
+        suffix = {'csv': '.csv', 'npz': '.npz', 'parquet': '.parquet', 'feather': '.feather'}[format]
+        if compression is not None:
+            suffix += {v: k for k, v in COMPRESSION_SUFFIXES.items()}[compression]
+        bounds = np.linspace(0, len(df), partitions + 1).astype(int)
+
+        tmp_dir = self._temporary_path(out)
+        tmp_dir.mkdir()
+        try:
+            with ThreadPoolExecutor(max_workers=partitions, thread_name_prefix='export-part') as pool:
+                futures = [
+                    pool.submit(self._write, df.iloc[start:stop], tmp_dir / f"part-{index:05d}{suffix}",
+                                format, compression, chunksize)
+                    for index, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))
+                ]
+                for future in futures:
+                    future.result()
+            self._swap_directory(tmp_dir, out)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _swap_directory(tmp_dir: Path, out: Path):
+        """
+        Move the finished partition directory into place, replacing any previous export.
+
+        A directory cannot be renamed over a non-empty one, so the previous
+        export is first renamed to ``.<name>.old`` and then the new one into
+        place. If the second rename fails, the previous export is moved back.
+        Between the two renames `out` does not exist, though: readers racing
+        the swap may find no output, and a process killed there leaves the
+        previous export in ``.<name>.old``.
+        """
+        if not out.exists():
+            os.replace(tmp_dir, out)
+            return
+        backup = out.with_name(f".{out.name}.old")
+        shutil.rmtree(backup, ignore_errors=True)
+        os.replace(out, backup)
+        try:
+            os.replace(tmp_dir, out)
+        except BaseException:
+            os.replace(backup, out)
+            raise
+        if backup.is_dir():
+            shutil.rmtree(backup, ignore_errors=True)
+        else:
+            backup.unlink(missing_ok=True)
+
+
+_default_exporter = DataExporter()
+
+
+def get_exporter() -> DataExporter:
+    """ The process-wide exporter behind `CSVHandler.export_data` """
+    return _default_exporter
@@ -0,0 +1,122 @@
+import weakref
+from collections.abc import Mapping, Sequence
+
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+COLUMN_KINDS = ('int', 'float', 'string')
+
+
+class DatasetSchema:
+    """
+    Expected columns and column kinds of a dataset, checked and coerced once per loaded data version.
+
+    `columns` maps each expected column to ``'int'``, ``'float'`` or
+    ``'string'``. A handler with a schema checks the CSV header against it
+    once per file version (`check_header`) and passes every frame it reads
+    through `validate`, which converts numeric columns that did not parse as
+    numbers with ``pd.to_numeric(errors='coerce')`` and stamps the frame.
+    Queries can then trust the declared columns and dtypes instead of
+    re-checking them on every call.
+
+    The stamp is kept in a weak registry on the schema rather than on the
+    frame (``DataFrame.attrs`` is deep-copied by every pandas operation), so
+    it marks exactly the cached frame object and disappears with it.
+    """
+
+    def __init__(self, name: str, columns: Mapping[str, str]):
+        unknown = {kind for kind in columns.values() if kind not in COLUMN_KINDS}
+        if unknown:
+            raise ValueError(f"Unknown column kinds: {sorted(unknown)}. Choose from {COLUMN_KINDS}.")
+        self.name = name
+        self.columns = dict(columns)
+        self.column_set = frozenset(self.columns)
+        self.numeric_columns = frozenset(col for col, kind in self.columns.items() if kind != 'string')
+        self._stamped: weakref.WeakValueDictionary[int, pd.DataFrame] = weakref.WeakValueDictionary()
+
+    def matches(self, header: Sequence[str]) -> bool:
+        """ Whether `header` holds every column of the schema """
+        return self.column_set.issubset(header)
+
+    def check_header(self, header: Sequence[str]):
+        """ Raise ValueError if `header` lacks columns of the schema """
+        missing = [col for col in self.columns if col not in header]
+        if missing:
+            raise ValueError(f"Columns not found in the dataset: {missing} (required by schema '{self.name}')")
+
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Coerce the schema's numeric columns present in `df` and stamp the result.
+
+        Returns `df` itself when nothing needs converting; string columns are
+        only checked for presence (by `check_header`).
+        """
+        coerced = {col: pd.to_numeric(df[col], errors='coerce') for col in self.numeric_columns
+                   if col in df.columns and not self._is_numeric(df[col].dtype)}
+        if coerced:
+            df = df.assign(**coerced)
+        self._stamped[id(df)] = df
+        return df
+
+    @staticmethod
+    def _is_numeric(dtype) -> bool:
+        return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+    def is_validated(self, df: pd.DataFrame) -> bool:
+        """ Whether `df` is a frame this schema validated (not a copy or projection of one) """
+        return self._stamped.get(id(df)) is df
+
+    def __repr__(self) -> str:
+        return f"DatasetSchema({self.name!r}, columns={len(self.columns)})"
+
+
+_REGISTRY: dict[str, DatasetSchema] = {}
+
+
+def register_schema(schema: DatasetSchema) -> DatasetSchema:
+    """ Add `schema` to the registry used by `get_schema` and `detect_schema` """
+    _REGISTRY[schema.name] = schema
+    return schema
+
+
+def get_schema(name: str) -> DatasetSchema:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown schema '{name}'. Choose from {sorted(_REGISTRY)}.") from None
+
+
+def detect_schema(header: Sequence[str]) -> DatasetSchema | None:
+    """ The registered schema with the most columns that `header` satisfies, if any """
+    candidates = [schema for schema in _REGISTRY.values() if schema.matches(header)]
+    return max(candidates, key=lambda schema: len(schema.columns), default=None)
+
+
+COVID_COUNTRY_WISE_SCHEMA = register_schema(DatasetSchema('covid_country_wise', {
+    'Country/Region': 'string',
+    'Confirmed': 'int',
+    'Deaths': 'int',
+    'Recovered': 'int',
+    'Active': 'int',
+    'New cases': 'int',
+    'New deaths': 'int',
+    'New recovered': 'int',
+    'Deaths / 100 Cases': 'float',
+    'Recovered / 100 Cases': 'float',
+    'Deaths / 100 Recovered': 'float',
+    'Confirmed last week': 'int',
+    '1 week change': 'int',
+    '1 week % increase': 'float',
+    'WHO Region': 'string',
+}))
+
+HOUSE_PRICE_SCHEMA = register_schema(DatasetSchema('house_price', {
+    'Square_Footage': 'int',
+    'Num_Bedrooms': 'int',
+    'Num_Bathrooms': 'int',
+    'Year_Built': 'int',
+    'Lot_Size': 'float',
+    'Garage_Size': 'int',
+    'Neighborhood_Quality': 'int',
+    'House_Price': 'float',
+}))
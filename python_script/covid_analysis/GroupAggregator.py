@@ -0,0 +1,151 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype
+
+SPEC_KEYS = ('by', 'count', 'sum', 'mean', 'quantile', 'ratio', 'sort_by', 'ascending')
+
+
+class GroupAggregator:
+    """
+    Fused multi-aggregate engine: many group-by reports from one pass over a frame.
+
+    Each report is described by a spec dict:
+
+    * ``by`` -- group key column, or list of columns (required)
+    * ``count`` -- True to add a ``count`` column with the group sizes
+    * ``sum`` / ``mean`` -- lists of value columns (missing values skipped); means
+      are output as ``'<column> mean'``
+    * ``quantile`` -- ``{column: q or [q, ...]}``, output columns ``'<column> q<q>'``
+      (linear interpolation, like `Series.quantile`)
+    * ``ratio`` -- ``{name: (numerator, denominator)}`` or
+      ``(numerator, denominator, scale)``: ``scale * sum(numerator) / sum(denominator)``
+      per group, NaN where the denominator sums to 0
+    * ``sort_by`` / ``ascending`` -- optional order of the result rows; by
+      default rows are ordered by the group keys, like `groupby`
+
+    Every key column is factorized once and shared by all reports, and every
+    sum is one `np.bincount` over the group codes, so adding a report costs a
+    few vectorized passes over single columns rather than another groupby
+    over the frame. Rows with a missing key are dropped, like `groupby`.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._keys: dict[str, tuple[np.ndarray, pd.Index]] = {}
+        self._groupings: dict[tuple[str, ...], tuple[np.ndarray, pd.DataFrame]] = {}
+        self._sums: dict[tuple[tuple[str, ...], str], tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def required_columns(specs: Mapping[str, Mapping]) -> list[str]:
+        """ Every column the specs read, in first-use order """
+        columns = []
+        for spec in specs.values():
+            unknown = set(spec) - set(SPEC_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown aggregation spec keys: {sorted(unknown)}. Choose from {SPEC_KEYS}.")
+            if 'by' not in spec:
+                raise ValueError("Every aggregation spec needs a 'by' group key.")
+            columns += _as_list(spec['by']) + list(spec.get('sum', ())) + list(spec.get('mean', ()))
+            columns += list(spec.get('quantile', {}))
+            for ratio in spec.get('ratio', {}).values():
+                columns += list(ratio[:2])
+        return list(dict.fromkeys(columns))
+
+    def run(self, specs: Mapping[str, Mapping]) -> dict[str, pd.DataFrame]:
+        """ Compute every report in `specs`; returns the result frames by report name """
+        return {name: self.aggregate(spec) for name, spec in specs.items()}
+
+    def aggregate(self, spec: Mapping) -> pd.DataFrame:
+        by = tuple(_as_list(spec['by']))
+        codes, result = self.group_keys(by)
+        result = result.copy()
+        n_groups = len(result)
+
+        if spec.get('count'):
+            result['count'] = np.bincount(codes[codes >= 0], minlength=n_groups)
+        for column in spec.get('sum', ()):
+            sums, _ = self._sum(by, column)
+            result[column] = sums.astype(np.int64) if is_integer_dtype(self.df[column].dtype) else sums
+        for column in spec.get('mean', ()):
+            sums, counts = self._sum(by, column)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[f"{column} mean"] = sums / counts
+        for column, qs in spec.get('quantile', {}).items():
+            for q, values in zip(np.atleast_1d(qs), self._quantiles(codes, n_groups, column, np.atleast_1d(qs))):
+                result[f"{column} q{q:g}"] = values
+        for name, ratio in spec.get('ratio', {}).items():
+            numerator, denominator, scale = (*ratio, 1) if len(ratio) == 2 else ratio
+            top, _ = self._sum(by, numerator)
+            bottom, _ = self._sum(by, denominator)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[name] = np.where(bottom != 0, top / np.where(bottom != 0, bottom, 1) * scale, np.nan)
+
+        if spec.get('sort_by') is not None:
+            result = result.sort_values(by=spec['sort_by'], ascending=spec.get('ascending', True), kind='stable')
+        return result.reset_index(drop=True)
+
+    def _key(self, column: str) -> tuple[np.ndarray, pd.Index]:
+        """ Sorted factorization of one key column, shared by every grouping using it """
+        if column not in self._keys:
+            codes, uniques = pd.factorize(self.df[column], sort=True)
+            self._keys[column] = (codes, pd.Index(uniques))
+        return self._keys[column]
+
+    def group_keys(self, by: tuple[str, ...]) -> tuple[np.ndarray, pd.DataFrame]:
+        """ Dense group codes per row (-1 for a missing key) and the observed key rows, in key order """
+        if by not in self._groupings:
+            keys = [self._key(column) for column in by]
+            combined = np.zeros(len(self.df), dtype=np.int64)
+            missing = np.zeros(len(self.df), dtype=bool)
+            for codes, uniques in keys:
+                combined = combined * len(uniques) + codes
+                missing |= codes < 0
+            combined[missing] = -1
+            # Mixed-radix codes of sorted factorizations are ordered like the key tuples
+            group_codes, observed = pd.factorize(combined, sort=True)
+            if len(observed) and observed[0] == -1:
+                group_codes, observed = group_codes - 1, observed[1:]
+            key_rows = {}
+            remainder = np.asarray(observed, dtype=np.int64)
+            for column, (_, uniques) in reversed(list(zip(by, keys))):
+                key_rows[column] = uniques.take(remainder % len(uniques))
+                remainder = remainder // len(uniques)
+            self._groupings[by] = (group_codes, pd.DataFrame({column: key_rows[column] for column in by}))
+        return self._groupings[by]
+
+    def _sum(self, by: tuple[str, ...], column: str) -> tuple[np.ndarray, np.ndarray]:
+        """ Per-group sum and non-missing count of `column` (one bincount each, cached) """
+        if (by, column) not in self._sums:
+            codes, key_rows = self.group_keys(by)
+            values = self.df[column].to_numpy(dtype=float, na_value=np.nan)
+            keep = (codes >= 0) & ~np.isnan(values)
+            sums = np.bincount(codes[keep], weights=values[keep], minlength=len(key_rows))
+            counts = np.bincount(codes[keep], minlength=len(key_rows))
+            self._sums[(by, column)] = (sums, counts)
+        return self._sums[(by, column)]
+
+    def _quantiles(self, codes: np.ndarray, n_groups: int, column: str, qs: np.ndarray) -> list[np.ndarray]:
+        """ Per-group quantiles from one lexsort of (group, value) """
+        values = self.df[column].to_numpy(dtype=float, na_value=np.nan)
+        keep = (codes >= 0) & ~np.isnan(values)
+        group, values = codes[keep], values[keep]
+        order = np.lexsort((values, group))
+        values = values[order]
+        counts = np.bincount(group, minlength=n_groups)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        results = []
+        for q in qs:
+            position = q * np.maximum(counts - 1, 0)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            empty = counts == 0
+            low = values[np.where(empty, 0, starts + lower)] if len(values) else np.full(n_groups, np.nan)
+            high = values[np.where(empty, 0, starts + upper)] if len(values) else np.full(n_groups, np.nan)
+            results.append(np.where(empty, np.nan, low + (high - low) * (position - lower)))
+        return results
+
+
+def _as_list(columns: str | Sequence[str]) -> list[str]:
+    return [columns] if isinstance(columns, str) else list(columns)
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+EVENT_FIELDS = ('operation', 'path', 'source', 'cache_hit', 'rows', 'columns',
+                'bytes_read', 'bytes_written', 'seconds', 'peak_memory_delta', 'timestamp')
+
+
+class IOInstrumentation:
+    """
+    Structured metrics for every `CSVHandler` load and export.
+
+    Each I/O call produces one event dict with the keys in `EVENT_FIELDS`:
+
+    * ``operation`` -- ``'load'``, ``'chunk'`` (one `iter_chunks` batch) or ``'export'``
+    * ``source`` -- ``'cache'``, ``'sidecar'``, ``'csv'``, ``'append'`` or the export format
+    * ``cache_hit`` -- whether the frame came from the in-memory cache
+    * ``rows`` / ``columns`` -- shape of the frame loaded or written
+    * ``bytes_read`` / ``bytes_written`` -- bytes touched on disk
+    * ``seconds`` -- wall time of the call (parse time for disk reads)
+    * ``peak_memory_delta`` -- peak Python allocation above the starting
+      level during the call, in bytes (None unless `trace_memory`)
+
+    Events are passed to every registered hook and, when `jsonl_path` is set,
+    appended to that file as JSON lines. The default console hook prints a
+    one-line summary of loads and exports.
+
+    Notes
+    -----
+    `trace_memory` turns on `tracemalloc`, which slows allocation-heavy code
+    noticeably; enable it for diagnosis rather than in every run. Peaks of
+    calls overlapping in several threads are not separated.
+    """
+
+    def __init__(self, jsonl_path: str | Path | None = None, trace_memory: bool = False,
+                 console: bool = True):
+        self.jsonl_path = Path(jsonl_path) if jsonl_path is not None else None
+        self.trace_memory = trace_memory
+        self._hooks: list[Callable[[dict], None]] = [console_hook] if console else []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[dict], None]):
+        """ Call `hook(event)` for every I/O event """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[dict], None]):
+        self._hooks.remove(hook)
+
+    @contextmanager
+    def measure(self, operation: str, path: str | Path) -> Iterator[dict]:
+        """
+        Time the enclosed I/O call and emit its event on success.
+
+        The caller fills in ``source``, ``rows``, ``bytes_read`` etc. on the
+        yielded dict; timing and memory fields are added here.
+        """
+        event = dict.fromkeys(EVENT_FIELDS)
+        event.update(operation=operation, path=str(Path(path).resolve()), cache_hit=False,
+                     bytes_read=0, bytes_written=0)
+        baseline = self._start_memory_trace()
+        started = time.perf_counter()
+        yield event
+        event['seconds'] = time.perf_counter() - started
+        if baseline is not None:
+            event['peak_memory_delta'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        event['timestamp'] = time.time()
+        self.emit(event)
+
+    def record(self, operation: str, path: str | Path, seconds: float, **fields):
+        """ Emit an event measured by the caller (used where a context manager does not fit) """
+        event = dict.fromkeys(EVENT_FIELDS)
+        event.update(operation=operation, path=str(Path(path).resolve()), cache_hit=False,
+                     bytes_read=0, bytes_written=0, seconds=seconds, timestamp=time.time())
+        event.update(fields)
+        self.emit(event)
+
+    def emit(self, event: dict):
+        """ Dispatch a finished event to the hooks and the JSON-lines log """
+        for hook in list(self._hooks):
+            hook(event)
+        if self.jsonl_path is not None:
+            line = json.dumps(event, default=str)
+            with self._lock, open(self.jsonl_path, 'a', encoding='utf-8') as fh:
+                fh.write(line + '\n')
+
+    def _start_memory_trace(self) -> int | None:
+        if not self.trace_memory:
+            return None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+
+def console_hook(event: dict):
+    """ Print a one-line summary of loads and exports (chunks are too frequent to print) """
+    shape = f"{event['rows']} rows x {event['columns']} cols, {event['seconds'] * 1000:.1f} ms"
+    if event['operation'] == 'load':
+        if event['cache_hit']:
+            print("Using cached data.")
+        elif event['source'] == 'append':
+            print(f"Appended rows from disk: {event['path']} ({shape}, {event['bytes_read']} bytes)")
+        else:
+            source = 'disk' if event['source'] == 'csv' else event['source']
+            print(f"Data loaded from {source}: {event['path']} ({shape})")
+    elif event['operation'] == 'export':
+        print(f"Data exported to {event['path']} ({shape}, {event['bytes_written']} bytes)")
+
+
+_default_instrumentation = IOInstrumentation()
+
+
+def get_instrumentation() -> IOInstrumentation:
+    """ The process-wide instrumentation used by every `CSVHandler` by default """
+    return _default_instrumentation
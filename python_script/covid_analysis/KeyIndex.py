@@ -0,0 +1,45 @@
+from collections.abc import Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class KeyIndex:
+    """
+    Hash index from the values of a key column (e.g. ``Country/Region``) to row positions.
+
+    Built once with a single factorize + stable argsort; afterwards a lookup of
+    k keys costs k dict probes plus a gather of the matching positions,
+    independent of the number of rows. Duplicate keys map to all of their
+    rows; missing values are not indexed.
+    """
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with a missing key (code -1) sort first; skip past them
+        ends = np.cumsum(counts) + int((codes < 0).sum())
+        self._order = order
+        self._slices = {key: (end - count, end) for key, count, end in zip(uniques, counts, ends)}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slices
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+    def positions(self, keys: Hashable | Iterable[Hashable]) -> np.ndarray:
+        """
+        Row positions holding any of `keys`, in file order (like an `isin` mask).
+
+        A single string (or other scalar) is looked up as one key; unknown
+        keys are ignored.
+        """
+        if isinstance(keys, str) or not isinstance(keys, Iterable):
+            keys = [keys]
+        parts = [self._order[start:stop] for start, stop in
+                 (self._slices[key] for key in dict.fromkeys(keys) if key in self._slices)]
+        if not parts:
+            return np.empty(0, dtype=self._order.dtype)
+        return np.sort(np.concatenate(parts))
@@ -0,0 +1,267 @@
+import operator
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+FILTER_OPS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+    '==': operator.eq, '!=': operator.ne, 'in': lambda col, values: col.isin(values),
+}
+DEFAULT_GROUP_VALUES = ('Confirmed', 'Deaths', 'Recovered')
+
+
+class LazyQuery:
+    """
+    Lazy, composable query over a `DataAnalyzer`'s data.
+
+    Builder methods (`filter`, `select`, `group`, `sort`, `head`, `top_n`)
+    only record steps and return a new query; nothing is loaded until
+    `collect()`. Before running, the plan is optimized:
+
+    * filters are pushed down past sorts, projections and (on key columns)
+      groups, and adjacent filters are fused into one mask
+    * only the columns the plan references are loaded (projection pushdown);
+      projections are cut down to the columns used after them and dropped
+      when they match the columns at that point
+    * heads move below projections, a sort followed by a head becomes one
+      partial top-N selection, and a sort whose order a later group or a
+      re-sort on the same column discards is removed (a later sort on
+      another column keeps it: its ties stay in the earlier sort's order)
+
+    `explain()` shows the optimized plan. Collected results are memoized by
+    the analyzer like its other queries, keyed on the optimized plan.
+
+    Examples
+    --------
+    >>> (analyzer.query()
+    ...     .filter('Confirmed', '>', 10)
+    ...     .group(['WHO Region'])
+    ...     .sort('Confirmed', ascending=False)
+    ...     .head(3)
+    ...     .collect())
+    """
+
+    def __init__(self, analyzer, steps: tuple = ()):
+        self._analyzer = analyzer
+        self._steps = steps
+
+    def _then(self, *step) -> 'LazyQuery':
+        return LazyQuery(self._analyzer, self._steps + (step,))
+
+    def filter(self, column_name: str, op: str, value) -> 'LazyQuery':
+        """ Keep rows where ``column_name <op> value``; `op` is one of `FILTER_OPS` (``'in'`` takes a collection or one string) """
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator '{op}'. Choose from {tuple(FILTER_OPS)}.")
+        if op == 'in':
+            # A single string is one value, not a collection of characters
+            value = (value,) if isinstance(value, str) else tuple(value)
+        return self._then('filter', ((column_name, op, value),))
+
+    def select(self, column_names: Sequence[str]) -> 'LazyQuery':
+        """ Keep only `column_names`, in this order """
+        return self._then('select', tuple(column_names))
+
+    def group(self, group_by_columns: Sequence[str],
+              value_columns: Sequence[str] = DEFAULT_GROUP_VALUES) -> 'LazyQuery':
+        """ Sum `value_columns` per group (one row per group, keys as columns, like `group_data`) """
+        group_by_columns = [group_by_columns] if isinstance(group_by_columns, str) else group_by_columns
+        return self._then('group', tuple(group_by_columns), tuple(value_columns))
+
+    def sort(self, column_name: str, ascending: bool = True) -> 'LazyQuery':
+        """ Stable sort by `column_name` """
+        return self._then('sort', column_name, ascending)
+
+    def head(self, n: int = 5) -> 'LazyQuery':
+        return self._then('head', n)
+
+    def top_n(self, n: int = 5, column_name: str = 'Confirmed', ascending: bool = False) -> 'LazyQuery':
+        """ Shorthand for ``sort(column_name, ascending).head(n)`` """
+        return self.sort(column_name, ascending).head(n)
+
+    def plan(self) -> tuple:
+        """ The optimized plan as a tuple of steps, starting with the scan """
+        header = self._analyzer.read_columns()
+        self._validate(header)
+        steps = self._push_down_filters(list(self._steps))
+        steps = self._fuse(self._push_down_heads(steps))
+        return self._push_down_projection(steps, header)
+
+    def explain(self) -> str:
+        """ The optimized plan, one node per line from the scan upwards """
+        lines = []
+        for step in self.plan():
+            kind, args = step[0], step[1:]
+            if kind == 'scan':
+                columns = '*' if args[0] is None else list(args[0])
+                lines.append(f"Scan({Path(self._analyzer.file_path).name}, columns={columns})")
+            elif kind == 'filter':
+                lines.append("Filter(" + " AND ".join(f"{col} {op} {value!r}" for col, op, value in args[0]) + ")")
+            elif kind == 'select':
+                lines.append(f"Select({list(args[0])})")
+            elif kind == 'group':
+                lines.append(f"Group(by={list(args[0])}, sum={list(args[1])})")
+            elif kind == 'sort':
+                lines.append(f"Sort(by={args[0]!r}, ascending={args[1]})")
+            elif kind == 'topn':
+                lines.append(f"TopN(n={args[0]}, by={args[1]!r}, ascending={args[2]})")
+            else:
+                lines.append(f"Head(n={args[0]})")
+        return "\n".join(lines)
+
+    def collect(self) -> pd.DataFrame:
+        """ Optimize and run the plan, returning the result frame """
+        plan = self.plan()
+        memo = self._analyzer._memo
+        key = ('query', plan, self._analyzer.data_version)
+        try:
+            hash(key)
+        except TypeError:
+            memo = None
+        if memo is not None and memo.maxsize > 0:
+            result = memo.get(key)
+            if result is None:
+                result = memo.put(key, self._execute(plan), shared=self._analyzer._cached_frames)
+            return result
+        return self._execute(plan)
+
+    def _validate(self, header: list[str]):
+        """ Raise ValueError for the first step referencing a column not available at that point """
+        available = list(header)
+        for step in self._steps:
+            kind = step[0]
+            if kind == 'filter':
+                referenced = [step[1][0][0]]
+            elif kind in ('select', 'group'):
+                referenced = list(step[1]) + (list(step[2]) if kind == 'group' else [])
+            elif kind == 'sort':
+                referenced = [step[1]]
+            else:
+                referenced = []
+            self._analyzer._check_columns(available, referenced)
+            if kind == 'select':
+                available = list(step[1])
+            elif kind == 'group':
+                available = list(step[1]) + list(step[2])
+
+    @staticmethod
+    def _push_down_filters(steps: list) -> list:
+        """ Move every filter below the sorts, selects and (on key columns) groups preceding it """
+        moved = True
+        while moved:
+            moved = False
+            for position in range(1, len(steps)):
+                step, previous = steps[position], steps[position - 1]
+                if step[0] != 'filter':
+                    continue
+                column = step[1][0][0]
+                if previous[0] in ('sort', 'select') or (previous[0] == 'group' and column in previous[1]):
+                    steps[position - 1], steps[position] = step, previous
+                    moved = True
+        return steps
+
+    @staticmethod
+    def _push_down_heads(steps: list) -> list:
+        """ Move every head below the selects preceding it, so a sort it follows becomes adjacent """
+        for position in range(1, len(steps)):
+            while position > 0 and steps[position][0] == 'head' and steps[position - 1][0] == 'select':
+                steps[position - 1], steps[position] = steps[position], steps[position - 1]
+                position -= 1
+        return steps
+
+    @staticmethod
+    def _fuse(steps: list) -> list:
+        """ Merge adjacent filters, fuse sort+head into top-N and drop sorts made redundant """
+        fused = []
+        for step in steps:
+            previous = fused[-1] if fused else None
+            if previous is not None and step[0] == 'filter' and previous[0] == 'filter':
+                fused[-1] = ('filter', previous[1] + step[1])
+            elif previous is not None and step[0] == 'head' and previous[0] == 'sort':
+                fused[-1] = ('topn', step[1], previous[1], previous[2])
+            elif previous is not None and step[0] == 'head' and previous[0] in ('head', 'topn'):
+                fused[-1] = previous[:1] + (min(previous[1], step[1]),) + previous[2:]
+            elif previous is not None and previous[0] == 'sort' and \
+                    (step[0] == 'group' or (step[0] == 'sort' and step[1] == previous[1])):
+                # A group ignores row order, and a stable re-sort on the same column leaves rows that
+                # tie on it in file order either way; a sort on another column keeps the previous one,
+                # which orders its ties
+                fused[-1] = step
+            else:
+                fused.append(step)
+        return fused
+
+    @staticmethod
+    def _push_down_projection(steps: list, header: list[str]) -> tuple:
+        """
+        Prepend the scan with only the columns the plan needs (None = all).
+
+        Every select is cut down to the columns still needed after it, so it
+        never asks for a column the narrowed scan skipped, and dropped when
+        that leaves it a no-op.
+        """
+        # Columns needed from each step's output (None = all), from the last step backwards
+        needed, needed_after = None, []
+        for step in reversed(steps):
+            needed_after.append(needed)
+            kind = step[0]
+            if kind == 'group':
+                needed = set(step[1]) | set(step[2])
+            elif kind == 'select':
+                needed = set(step[1]) if needed is None else set(step[1]) & needed
+            elif needed is not None and kind == 'filter':
+                needed |= {column for column, _, _ in step[1]}
+            elif needed is not None and kind in ('sort', 'topn'):
+                needed.add(step[1] if kind == 'sort' else step[2])
+        needed_after.reverse()
+
+        columns = None if needed is None else tuple(col for col in header if col in needed)
+        available = list(header) if columns is None else list(columns)
+        reshaped = False
+        optimized = []
+        for step, after in zip(steps, needed_after):
+            if step[0] == 'select':
+                kept = [col for col in step[1] if after is None or col in after]
+                if not reshaped and columns is not None and set(kept) == set(columns):
+                    # Load straight in the projection's order; the projection itself becomes a no-op
+                    columns = tuple(kept)
+                elif kept != available:
+                    optimized.append(('select', tuple(kept)))
+                available, reshaped = kept, True
+                continue
+            if step[0] == 'group':
+                available, reshaped = list(step[1]) + list(step[2]), True
+            optimized.append(step)
+        return (('scan', columns),) + tuple(optimized)
+
+    def _execute(self, plan: tuple) -> pd.DataFrame:
+        columns = plan[0][1]
+        df = self._analyzer.load_data() if columns is None else self._analyzer._load_columns(columns)
+        for step in plan[1:]:
+            kind = step[0]
+            if kind == 'filter':
+                mask = np.ones(len(df), dtype=bool)
+                for column, op, value in step[1]:
+                    mask &= FILTER_OPS[op](df[column], value).to_numpy(dtype=bool, na_value=False)
+                df = df[mask]
+            elif kind == 'select':
+                df = df[list(step[1])]
+            elif kind == 'group':
+                df = df.groupby(list(step[1]), observed=True)[list(step[2])].sum().reset_index()
+            elif kind == 'sort':
+                df = df.sort_values(by=step[1], ascending=step[2], kind='stable')
+            elif kind == 'topn':
+                df = self._top_n(df, *step[1:])
+            else:
+                df = df.head(step[1])
+        return df
+
+    @staticmethod
+    def _top_n(df: pd.DataFrame, n: int, column_name: str, ascending: bool) -> pd.DataFrame:
+        """ Partial selection for numeric columns (same rows as a stable sort + head) """
+        if is_numeric_dtype(df[column_name]) and not is_bool_dtype(df[column_name]) \
+                and not df[column_name].isna().any():
+            return df.nsmallest(n, column_name) if ascending else df.nlargest(n, column_name)
+        return df.sort_values(by=column_name, ascending=ascending, kind='stable').head(n)
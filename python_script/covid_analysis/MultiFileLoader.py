@@ -0,0 +1,177 @@
+import glob
+import os
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from python_script.covid_analysis.CSVHandler import CSVHandler
+
+SNAPSHOT_COLUMN = 'snapshot'
+
+
+def _load_snapshot(file_path: str, columns: list[str] | None, handler_options: dict) -> tuple[pd.DataFrame, dict]:
+    """ Load one file through `CSVHandler` and time it (module level so process pools can pickle it) """
+    started = time.perf_counter()
+    df = CSVHandler(file_path, **handler_options).load_data(columns=columns)
+    stats = {
+        'path': file_path,
+        'rows': len(df),
+        'columns': df.shape[1],
+        'seconds': time.perf_counter() - started,
+    }
+    return df, stats
+
+
+class MultiFileLoader:
+    """
+    Load many CSV snapshots (e.g. one `country_wise_latest`-style file per day) concurrently.
+
+    Every file is read through `CSVHandler`, so sidecars, the shared cache and
+    column projection all apply per file. Files are parsed in a thread pool
+    by default; pass `executor='process'` to parse in separate processes when
+    parsing is CPU-bound (frames are then pickled back to the parent, and the
+    parent's shared cache is not populated).
+
+    Parameters
+    ----------
+    paths : str, Path or sequence of them
+        A glob pattern (e.g. ``'snapshots/*.csv'``), a single file, or an
+        explicit list of files.
+    workers : int, optional
+        Pool size. Defaults to the executor's own default.
+    executor : {'thread', 'process'}, default 'thread'
+    snapshot_key : callable, optional
+        Maps a file path to its snapshot key. Defaults to the path relative
+        to the directory holding all files, without its suffix (the file
+        stem when they share one directory). Keys must be unique.
+    columns : sequence of str, optional
+        Load only these columns from every file.
+    handler_options : dict, optional
+        Extra keyword arguments for each `CSVHandler` (e.g. ``compact=True``).
+    """
+
+    def __init__(self, paths: str | Path | Sequence[str | Path], workers: int | None = None,
+                 executor: str = 'thread', snapshot_key: Callable[[Path], str] | None = None,
+                 columns: Sequence[str] | None = None, handler_options: dict | None = None):
+        if executor not in ('thread', 'process'):
+            raise ValueError("Parameter 'executor' must be 'thread' or 'process'.")
+        if workers is not None and workers <= 0:
+            raise ValueError("Parameter 'workers' must be a positive integer.")
+        self.paths = self._resolve_paths(paths)
+        self.workers = workers
+        self.executor = executor
+        self.root = Path(os.path.commonpath([path.resolve().parent for path in self.paths]))
+        self.snapshot_key = snapshot_key if snapshot_key is not None else self._relative_key
+        self.columns = list(columns) if columns is not None else None
+        self.handler_options = dict(handler_options or {})
+        # Per-file and per-`load_frames` timings
+        self.stats: list[dict] = []
+        self.batch_stats: list[dict] = []
+        self._check_unique_keys()
+
+    @staticmethod
+    def _resolve_paths(paths) -> list[Path]:
+        if isinstance(paths, (str, Path)):
+            pattern = str(paths)
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        else:
+            matches = [str(path) for path in paths]
+        if not matches:
+            raise FileNotFoundError(f"No CSV files match: {paths}")
+        return [Path(path) for path in matches]
+
+    def _relative_key(self, path: Path) -> str:
+        """ Default snapshot key: `path` relative to `root`, without its suffix """
+        return path.resolve().relative_to(self.root).with_suffix('').as_posix()
+
+    def _check_unique_keys(self):
+        """ Raise ValueError if two files map to one snapshot key (one would silently replace the other) """
+        seen: dict[str, Path] = {}
+        for path in self.paths:
+            key = self.snapshot_key(path)
+            if key in seen:
+                raise ValueError(f"Files {seen[key]} and {path} have the same snapshot key '{key}'.")
+            seen[key] = path
+
+    @property
+    def keys(self) -> list[str]:
+        return [self.snapshot_key(path) for path in self.paths]
+
+    def load(self, lazy: bool = False) -> 'pd.DataFrame | SnapshotCollection':
+        """
+        Load every snapshot.
+
+        Returns one frame with all rows and a leading ``snapshot`` column, or,
+        with `lazy=True`, a `SnapshotCollection` that loads each file only
+        when it is accessed.
+        """
+        if lazy:
+            return SnapshotCollection(self)
+        frames = self.load_frames(self.paths)
+        return self.concat(frames)
+
+    def load_frames(self, paths: Sequence[Path]) -> dict[str, pd.DataFrame]:
+        """ Parse `paths` concurrently; returns frames by snapshot key in `paths` order """
+        pool_class = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+        started = time.perf_counter()
+        with pool_class(max_workers=self.workers) as pool:
+            futures = [pool.submit(_load_snapshot, str(path), self.columns, self.handler_options)
+                       for path in paths]
+            results = [future.result() for future in futures]
+
+        frames = {}
+        for path, (df, stats) in zip(paths, results):
+            key = self.snapshot_key(path)
+            frames[key] = df
+            self.stats.append({'snapshot': key, **stats})
+        self.batch_stats.append({'files': len(paths), 'rows': sum(len(df) for df in frames.values()),
+                                 'seconds': time.perf_counter() - started, 'executor': self.executor,
+                                 'workers': self.workers})
+        return frames
+
+    def concat(self, frames: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+        """ Concatenate frames, tagging every row with its snapshot key """
+        # concat with keys tags rows without a per-frame copy; the result is copied once
+        combined = pd.concat(list(frames.values()), keys=list(frames.keys()), names=[SNAPSHOT_COLUMN, None])
+        combined = combined.reset_index(level=0).reset_index(drop=True)
+        combined[SNAPSHOT_COLUMN] = combined[SNAPSHOT_COLUMN].astype('category')
+        return combined
+
+    def stats_frame(self) -> pd.DataFrame:
+        """ Per-file timing stats (snapshot, path, rows, columns, seconds) as a DataFrame """
+        return pd.DataFrame(self.stats, columns=['snapshot', 'path', 'rows', 'columns', 'seconds'])
+
+
+class SnapshotCollection(Mapping):
+    """
+    Lazily loaded snapshots of a `MultiFileLoader`, keyed by snapshot key.
+
+    Accessing a key loads (and memoises) that file only; `to_frame()` loads
+    whatever is still missing concurrently and concatenates everything.
+    """
+
+    def __init__(self, loader: MultiFileLoader):
+        self._loader = loader
+        self._paths = {loader.snapshot_key(path): path for path in loader.paths}
+        self._frames: dict[str, pd.DataFrame] = {}
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        if key not in self._frames:
+            self._frames.update(self._loader.load_frames([self._paths[key]]))
+        return self._frames[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def to_frame(self) -> pd.DataFrame:
+        """ Load all remaining snapshots concurrently and concatenate them """
+        pending = [path for key, path in self._paths.items() if key not in self._frames]
+        if pending:
+            self._frames.update(self._loader.load_frames(pending))
+        return self._loader.concat({key: self._frames[key] for key in self._paths})
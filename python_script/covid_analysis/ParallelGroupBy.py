@@ -0,0 +1,158 @@
+import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype
+
+from python_script.covid_analysis.GroupAggregator import GroupAggregator
+
+DEFAULT_MIN_PARALLEL_ROWS = 1_000_000
+
+
+def _attach(name: str, dtype: np.dtype, shape: tuple[int, ...]) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _partition_sums(keys: dict[str, tuple[str, np.dtype, pd.CategoricalDtype | None]], values_name: str,
+                    rows: int, integer: list[bool], start: int, stop: int) -> tuple[pd.DataFrame, list[np.ndarray]]:
+    """
+    Group sums of rows [start, stop): the partition's key rows and one sum array per value column.
+
+    Key columns (raw values, or codes of categoricals) and value columns are
+    read from shared memory (module level so the pool can pickle it).
+    """
+    # Pool workers share the parent's resource tracker, so attaching does not hand ownership
+    # to them; the parent unlinks the blocks once every partition is done
+    blocks = []
+    try:
+        key_columns = {}
+        for column, (name, dtype, categorical) in keys.items():
+            block, values = _attach(name, dtype, (rows,))
+            blocks.append(block)
+            values = values[start:stop]
+            key_columns[column] = values if categorical is None else \
+                pd.Categorical.from_codes(values, dtype=categorical)
+        codes, key_rows = GroupAggregator(pd.DataFrame(key_columns, copy=False)).group_keys(tuple(keys))
+        block, values = _attach(values_name, np.dtype(np.float64), (len(integer), rows))
+        blocks.append(block)
+        keep = codes >= 0
+        sums = [np.bincount(codes[keep], weights=values[i, start:stop][keep], minlength=len(key_rows))
+                for i in range(len(integer))]
+        del key_columns, values
+    finally:
+        for block in blocks:
+            block.close()
+    return key_rows, [column_sums.astype(np.int64) if is_int else column_sums
+                      for column_sums, is_int in zip(sums, integer)]
+
+
+class ParallelGroupBy:
+    """
+    Group sums computed on row partitions in a process pool.
+
+    The parent copies the key columns (categorical keys as their integer
+    codes) and the value columns into `multiprocessing.shared_memory`
+    blocks. Each worker attaches to the blocks by name, so no rows are
+    pickled, factorizes the keys of its row range (see `GroupAggregator`),
+    sums its rows with one `np.bincount` per value column and returns its
+    key rows with their sums. Both the key factorization and the sums run in
+    parallel; the parent only merges the small per-partition key tables, in
+    key order like `groupby`.
+
+    Inputs with fewer than `min_rows` rows, `workers` of 1, or object
+    (string) key columns use a plain serial `groupby` instead: process
+    start-up and the copy into shared memory would cost more than they save,
+    and handing string keys to the workers would cost the parent as much as
+    factorizing them itself. Load with compact dtypes (``compact=True``) to
+    get categorical string keys.
+
+    Notes
+    -----
+    Integer columns sum to int64, as in pandas. Each partition accumulates
+    in float64, so they are exact while a partition's group sum stays below
+    2**53.
+    """
+
+    _pools: dict[int, ProcessPoolExecutor] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, workers: int | None = None, min_rows: int = DEFAULT_MIN_PARALLEL_ROWS):
+        if workers is not None and workers <= 0:
+            raise ValueError("Parameter 'workers' must be a positive integer.")
+        self.workers = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+
+    @staticmethod
+    def supports_keys(df: pd.DataFrame, group_by_columns: Sequence[str]) -> bool:
+        """ Whether every key column can be shared as a fixed-width array (numeric, datetime or categorical) """
+        return all(isinstance(df[column].dtype, pd.CategoricalDtype)
+                   or (isinstance(df[column].dtype, np.dtype) and df[column].dtype != object)
+                   for column in group_by_columns)
+
+    def group_sums(self, df: pd.DataFrame, group_by_columns: Sequence[str],
+                   value_columns: Sequence[str]) -> pd.DataFrame:
+        """ Same result as ``df.groupby(group_by_columns, observed=True)[value_columns].sum()`` """
+        group_by_columns, value_columns = list(group_by_columns), list(value_columns)
+        if self.workers == 1 or len(df) < self.min_rows or not self.supports_keys(df, group_by_columns):
+            return df.groupby(group_by_columns, observed=True)[value_columns].sum()
+
+        integer = [is_integer_dtype(df[column].dtype) for column in value_columns]
+        bounds = np.linspace(0, len(df), self.workers + 1).astype(int)
+        blocks = []
+        try:
+            keys = {}
+            for column in group_by_columns:
+                series = df[column]
+                categorical = series.dtype if isinstance(series.dtype, pd.CategoricalDtype) else None
+                values = series.to_numpy() if categorical is None else series.cat.codes.to_numpy()
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                blocks.append(block)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                keys[column] = (block.name, values.dtype, categorical)
+
+            values_block = shared_memory.SharedMemory(create=True, size=max(1, len(df) * len(value_columns) * 8))
+            blocks.append(values_block)
+            shared_values = np.ndarray((len(value_columns), len(df)), dtype=np.float64, buffer=values_block.buf)
+            for i, column in enumerate(value_columns):
+                # Written column by column straight into shared memory; missing values sum as 0
+                shared_values[i] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                if not integer[i]:
+                    np.nan_to_num(shared_values[i], copy=False, nan=0.0)
+            del shared_values
+
+            pool = self._pool(self.workers)
+            futures = [pool.submit(_partition_sums, keys, values_block.name, len(df), integer, start, stop)
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            partials = [future.result() for future in futures]
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return self._merge(partials, group_by_columns, value_columns, integer)
+
+    @staticmethod
+    def _merge(partials: list[tuple[pd.DataFrame, list[np.ndarray]]], group_by_columns: list[str],
+               value_columns: list[str], integer: list[bool]) -> pd.DataFrame:
+        """ Add the per-partition sums of equal keys; rows come out in key order """
+        partition_keys = pd.concat([key_rows for key_rows, _ in partials], ignore_index=True)
+        codes, key_rows = GroupAggregator(partition_keys).group_keys(tuple(group_by_columns))
+        result = key_rows.copy()
+        for i, column in enumerate(value_columns):
+            totals = np.zeros(len(key_rows), dtype=np.int64 if integer[i] else np.float64)
+            # Every partition key row is an observed key, so no code is -1
+            np.add.at(totals, codes, np.concatenate([sums[i] for _, sums in partials]))
+            result[column] = totals
+        return result.set_index(group_by_columns)
+
+    @classmethod
+    def _pool(cls, workers: int) -> ProcessPoolExecutor:
+        """ One long-lived pool per worker count, so repeated queries skip process start-up """
+        with cls._pools_lock:
+            if workers not in cls._pools:
+                cls._pools[workers] = ProcessPoolExecutor(max_workers=workers)
+            return cls._pools[workers]
@@ -0,0 +1,116 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+DEFAULT_QUANTILE_ERROR = 0.01
+MIN_K = 8
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch (Karnin, Lang & Liberty) over one numeric column.
+
+    Values are kept in a stack of compactors; level ``h`` items each stand
+    for ``2**h`` input values. When a level overflows it is sorted and every
+    other item (random offset) is promoted to the next level, so memory stays
+    ``O(k log(n / k))`` however many values stream in, and two sketches built
+    over different chunks or partitions merge into the sketch of their union.
+
+    `error` is the target normalized rank error: a returned q-quantile has a
+    true rank within ``(q ± error) * n`` with ~99% probability (bound from
+    the DataSketches KLL analysis). Until the sketch first compacts it holds
+    every value and `quantile` is exact, with the same linear interpolation
+    as `Series.quantile`. Missing values are skipped.
+    """
+
+    def __init__(self, error: float = DEFAULT_QUANTILE_ERROR, seed: int | Sequence[int] | None = 0):
+        if not 0 < error < 1:
+            raise ValueError("Parameter 'error' must be between 0 and 1.")
+        self.error = error
+        self.k = max(MIN_K, math.ceil((2.296 / error) ** (1 / 0.9723)))
+        self.count = 0
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, error: float = DEFAULT_QUANTILE_ERROR, seed: int | None = 0) -> 'QuantileSketch':
+        sketch = cls(error, seed)
+        sketch.update(values)
+        return sketch
+
+    def update(self, values) -> 'QuantileSketch':
+        """ Add a batch of values (in-place); returns self """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self.count += values.size
+        self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Sketch of the values of both `self` and `other` (neither's values are modified).
+
+        The merged sketch's random generator is seeded from both parents'
+        generators, so repeated merges keep drawing independent compaction
+        offsets (a fixed seed would repeat the same choice on every merge and
+        bias the ranks in one direction).
+        """
+        seed = [sketch._rng.integers(2 ** 63) for sketch in (self, other)]
+        merged = QuantileSketch(min(self.error, other.error), seed=seed)
+        merged.count = self.count + other.count
+        depth = max(len(self._levels), len(other._levels))
+        merged._levels = [np.concatenate([sketch._levels[h] for sketch in (self, other) if h < len(sketch._levels)])
+                          for h in range(depth)]
+        merged._compress()
+        return merged
+
+    __add__ = merge
+
+    @property
+    def exact(self) -> bool:
+        """ True while no value has been compacted away """
+        return len(self._levels) == 1
+
+    def _capacity(self, level: int) -> int:
+        # Lower levels get geometrically smaller capacities (c = 2/3), the top level gets k
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self._levels) - 1 - level)))
+
+    def _compress(self):
+        while True:
+            # Adding a level shrinks the capacities below it, so always restart from the bottom
+            level = next((h for h, items in enumerate(self._levels) if items.size > self._capacity(h)), None)
+            if level is None:
+                return
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(self._levels[level])
+            # An odd item out stays behind so the promoted half is an exact pairing
+            keep, items = items[:items.size % 2], items[items.size % 2:]
+            promoted = items[self._rng.integers(2)::2]
+            self._levels[level] = keep
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+
+    def quantile(self, q: float | Sequence[float]) -> float | np.ndarray:
+        """ Approximate q-quantile(s); NaN for an empty sketch """
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            result = np.full(qs.shape, np.nan)
+        elif self.exact:
+            result = np.quantile(self._levels[0], qs)
+        else:
+            values = np.concatenate(self._levels)
+            weights = np.concatenate([np.full(items.size, 2.0 ** level) for level, items in enumerate(self._levels)])
+            order = np.argsort(values, kind='stable')
+            values, cumulative = values[order], np.cumsum(weights[order])
+            targets = qs * cumulative[-1]
+            result = values[np.minimum(np.searchsorted(cumulative, targets, side='left'), values.size - 1)]
+        return float(result[0]) if np.ndim(q) == 0 else result
+
+    def __len__(self) -> int:
+        """ Number of items retained (not the number of values seen, see `count`) """
+        return sum(items.size for items in self._levels)
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(error={self.error}, k={self.k}, count={self.count}, retained={len(self)})"
@@ -0,0 +1,230 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MEMO_SIZE = 128
+DEFAULT_MEMO_BYTES = 256 << 20  # 256 MiB
+
+
+class QueryMemo:
+    """
+    LRU store of query results, keyed on method, arguments and data version.
+
+    The store holds at most `maxsize` entries and `max_bytes` bytes (deep
+    memory of the stored frames, None for no byte limit); least recently
+    used entries are evicted past either bound, and a single result larger
+    than `max_bytes` is returned without being stored.
+
+    DataFrame results are frozen when stored: their numeric NumPy columns
+    become read-only arrays, and every hit returns a shallow copy of the
+    frozen frame with its object (string) columns copied. Callers can
+    therefore add, drop or reorder columns on what they get back, but an
+    in-place write to numeric values (``df.loc[...] = x``, ``df['col'] += 1``)
+    raises ``ValueError: assignment destination is read-only`` instead of
+    silently corrupting the memoized result. Take ``.copy()`` first to
+    mutate values.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE, max_bytes: int | None = DEFAULT_MEMO_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        """ Return a caller-safe view of the memoized result, or None """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = self._entries[key][0]
+        return _caller_view(result)
+
+    def put(self, key: Hashable, result, shared: Iterable[pd.DataFrame] = ()):
+        """
+        Freeze and store `result`, evicting least recently used entries beyond the bounds.
+
+        `shared` lists frames `result` may share arrays with (the loaded
+        data): those arrays are copied, while arrays only `result` holds are
+        frozen in place.
+        """
+        frozen = freeze_result(result, shared)
+        nbytes = _result_bytes(frozen)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return _caller_view(frozen)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (frozen, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.maxsize or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+        return _caller_view(frozen)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'maxsize': self.maxsize,
+                    'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def _result_bytes(result) -> int:
+    """ Deep memory of a stored result (frames, series or a dict of them) """
+    if isinstance(result, dict):
+        return sum(_result_bytes(value) for value in result.values())
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(index=True, deep=True))
+    return 0
+
+
+def _owner(values: np.ndarray) -> np.ndarray:
+    """ The array owning the memory `values` is a view of """
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+def _shared_owners(frames: Iterable[pd.DataFrame]) -> set[int]:
+    return {id(_owner(values)) for df in frames for _, column in df.items()
+            if isinstance(values := column.to_numpy(copy=False), np.ndarray)}
+
+
+def _is_frozen_column(dtype) -> bool:
+    """ Numeric/bool/datetime NumPy columns are frozen; object and extension columns are not """
+    return isinstance(dtype, np.dtype) and dtype != object
+
+
+def _read_only(values: np.ndarray, shared_owners: set[int]) -> np.ndarray:
+    """ A read-only view of `values`, over a copy if its memory belongs to a shared frame """
+    if not values.flags.writeable:
+        return values
+    if id(_owner(values)) in shared_owners:
+        values = values.copy()
+    else:
+        values = values.view()
+    values.flags.writeable = False
+    return values
+
+
+def _copy_column(values, shared_owners: set[int]):
+    """ Object/extension columns stay writable, so only shared ones are copied """
+    if isinstance(values, np.ndarray):
+        return values.copy() if id(_owner(values)) in shared_owners else values
+    return values.copy()
+
+
+def _caller_view(frozen):
+    """
+    Shallow copies of frozen frames, so callers' structural changes stay local.
+
+    Object and extension columns are writable (pandas needs writable object
+    buffers, e.g. for ``memory_usage(deep=True)``), so they are copied
+    instead of shared with the memoized result.
+    """
+    if isinstance(frozen, pd.DataFrame):
+        view = frozen.copy(deep=False)
+        for position, dtype in enumerate(frozen.dtypes):
+            if not _is_frozen_column(dtype):
+                view.isetitem(position, frozen.iloc[:, position].copy())
+        return view
+    if isinstance(frozen, pd.Series):
+        return frozen.copy(deep=not _is_frozen_column(frozen.dtype))
+    if isinstance(frozen, dict):
+        return {name: _caller_view(value) for name, value in frozen.items()}
+    return frozen
+
+
+def freeze_result(result, shared: Iterable[pd.DataFrame] = ()):
+    """
+    Freeze a DataFrame/Series (or a dict of them) for the memo.
+
+    Numeric NumPy columns become read-only arrays: arrays only the result
+    holds (what take, sort and groupby build) are frozen in place, arrays
+    shared with a frame in `shared` are copied first. Object and extension
+    columns are kept writable and copied only when shared.
+    """
+    if isinstance(result, dict):
+        shared = list(shared)
+        return {name: freeze_result(value, shared) for name, value in result.items()}
+    if not isinstance(result, (pd.DataFrame, pd.Series)):
+        return result
+    shared_owners = _shared_owners(shared)
+    if isinstance(result, pd.Series):
+        values = result.to_numpy(copy=False) if _is_frozen_column(result.dtype) else result.array
+        freeze = _read_only if _is_frozen_column(result.dtype) else _copy_column
+        return pd.Series(freeze(values, shared_owners), index=result.index, name=result.name, copy=False)
+    columns = {}
+    for position, dtype in enumerate(result.dtypes):
+        column = result.iloc[:, position]
+        if _is_frozen_column(dtype):
+            columns[position] = _read_only(column.to_numpy(copy=False), shared_owners)
+        else:
+            columns[position] = _copy_column(column.to_numpy(copy=False) if dtype == object else column.array,
+                                             shared_owners)
+    frozen = pd.DataFrame(columns, index=result.index, copy=False)
+    frozen.columns = result.columns
+    return frozen
+
+
+def _hashable(value):
+    """ Turn list/dict/set arguments into hashable equivalents for the memo key """
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def memoized(method):
+    """
+    Memoize a `DataAnalyzer` query on ``(method, bound arguments, data_version)``.
+
+    Defaults are bound first, so ``summarize_data()`` and
+    ``summarize_data('WHO Region')`` share an entry. Streaming calls (a
+    non-None ``chunksize``) and unhashable arguments bypass the memo.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = getattr(self, '_memo', None)
+        if memo is None or memo.maxsize <= 0:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop('self')
+        if arguments.get('chunksize') is not None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, _hashable(arguments), self.data_version)
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        result = memo.get(key)
+        if result is None:
+            result = memo.put(key, method(self, *args, **kwargs), shared=getattr(self, '_cached_frames', ()))
+        return result
+
+    return wrapper
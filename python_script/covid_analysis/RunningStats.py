@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    Incremental count/mean/variance/min/max of one numeric column (Welford / Chan et al.).
+
+    `update` folds in a batch of values (a chunk, or rows appended to a
+    file) by merging the batch's own mean and sum of squared deviations, so
+    the statistics never need the earlier values again. `merge` combines
+    statistics computed independently, e.g. over partitions on different
+    workers, exactly as if all values had been seen by one object. Missing
+    values are skipped, like pandas' `mean`/`std`.
+
+    The state is a handful of floats; `to_dict`/`from_dict` move it between
+    processes.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 minimum: float = np.inf, maximum: float = -np.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    @classmethod
+    def from_values(cls, values) -> 'RunningStats':
+        stats = cls()
+        stats.update(values)
+        return stats
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns=None) -> dict[str, 'RunningStats']:
+        """ Statistics of every numeric column of `df` (or of `columns`), by column name """
+        if columns is None:
+            columns = df.select_dtypes('number').columns
+        return {column: cls.from_values(df[column]) for column in columns}
+
+    def update(self, values) -> 'RunningStats':
+        """ Fold a batch of values into the statistics (in-place); returns self """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            batch_mean = values.mean()
+            self._combine(values.size, batch_mean, ((values - batch_mean) ** 2).sum(),
+                          values.min(), values.max())
+        return self
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """ Statistics over the values of both `self` and `other` (neither is modified) """
+        merged = self.copy()
+        if other.count:
+            merged._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return merged
+
+    __add__ = merge
+
+    def _combine(self, count: int, mean: float, m2: float, minimum: float, maximum: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def copy(self) -> 'RunningStats':
+        return RunningStats(self.count, self.mean, self.m2, self.min, self.max)
+
+    def var(self, ddof: int = 1) -> float:
+        """ Variance (sample variance by default, like pandas); NaN with too few values """
+        return self.m2 / (self.count - ddof) if self.count > ddof else np.nan
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.var(ddof)))
+
+    def bounds(self, z: float = 2.0) -> tuple[float, float]:
+        """ ``(mean - z * std, mean + z * std)``, the z-score outlier fences """
+        mean = self.mean if self.count else np.nan
+        return mean - z * self.std(), mean + z * self.std()
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'RunningStats':
+        return cls(state['count'], state['mean'], state['m2'], state['min'], state['max'])
+
+    def __repr__(self) -> str:
+        return (f"RunningStats(count={self.count}, mean={self.mean:.6g}, std={self.std():.6g}, "
+                f"min={self.min:.6g}, max={self.max:.6g})")
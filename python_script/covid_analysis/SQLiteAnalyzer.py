@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import threading
+from collections.abc import Hashable, Iterator, Sequence
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from python_script.covid_analysis.DataAnalyser import DataAnalyzer
+from python_script.covid_analysis.QueryMemo import memoized
+from python_script.covid_analysis.SidecarCache import SidecarCache
+
+SQLITE_SUFFIX = '.sqlite'
+SQLITE_FORMAT_VERSION = 1
+DATA_TABLE = 'data'
+ROW_COLUMN = '__row__'
+DEFAULT_INGEST_CHUNKSIZE = 100_000
+DEFAULT_INDEXED_COLUMNS = ('Country/Region', 'WHO Region')
+VALUE_COLUMNS = ['Confirmed', 'Deaths', 'Recovered']
+
+
+def _quote(name: str) -> str:
+    """ SQL identifier quoting (column names contain spaces and slashes) """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _params(values: Sequence) -> list:
+    """ Query parameters as Python scalars (sqlite3 would bind a NumPy integer as a BLOB) """
+    return [value.item() if isinstance(value, np.generic) else value for value in values]
+
+
+class SQLiteAnalyzer(DataAnalyzer):
+    """
+    `DataAnalyzer` backed by an on-disk SQLite copy of the CSV, for files too large for memory.
+
+    The CSV is streamed into ``<csv>.sqlite`` once, in chunks, with indexes
+    on `indexed_columns` (``Country/Region`` and ``WHO Region`` by default).
+    The database records the size, mtime and content hash of the CSV it was
+    built from; later runs reuse it while they match, and re-ingest when the
+    CSV changed.
+
+    `summarize_data`, `filter_data`, `get_top_n`, `get_bottom_n`,
+    `group_data` and `fetch_data_by_country_by_column` run as SQL queries,
+    so memory is bounded by the size of their results rather than of the
+    file. They keep the `DataAnalyzer` signatures and return the same
+    frames: columns, dtypes, row order and the original row labels. Every
+    other method falls back to the in-memory frame.
+
+    Notes
+    -----
+    `chunksize` arguments are accepted for compatibility; SQL queries never
+    hold the whole table, and `filter_data(chunksize=...)` yields its result
+    in batches of that many rows.
+    """
+
+    def __init__(self, file_path, db_path: str | Path | None = None,
+                 indexed_columns: Sequence[str] = DEFAULT_INDEXED_COLUMNS,
+                 ingest_chunksize: int = DEFAULT_INGEST_CHUNKSIZE, **options):
+        super().__init__(file_path, **options)
+        self.db_path = Path(db_path) if db_path is not None else Path(f"{file_path}{SQLITE_SUFFIX}")
+        self.indexed_columns = list(indexed_columns)
+        self.ingest_chunksize = ingest_chunksize
+        self._ingested_key: tuple | None = None
+        self._dtypes: dict[str, str] = {}
+        self._ingest_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per query keeps the analyzer usable from any thread
+        return sqlite3.connect(self.db_path)
+
+    def ensure_ingested(self) -> bool:
+        """
+        Make sure the database matches the current CSV; returns True if it was (re)built.
+
+        A cheap size/mtime check runs on every query; the CSV is hashed only
+        when the database is first opened or the file changed.
+        """
+        key = self._make_cache_key()
+        if key == self._ingested_key:
+            return False
+        with self._ingest_lock:
+            if key == self._ingested_key:
+                return False
+            fingerprint = SidecarCache(self.file_path).fingerprint(with_hash=False)
+            meta = self._read_meta()
+            rebuilt = False
+            if not self._meta_matches(meta, fingerprint):
+                fingerprint = SidecarCache(self.file_path).fingerprint()
+                meta = self._ingest(fingerprint)
+                rebuilt = True
+            self._dtypes = meta['dtypes']
+            self._ingested_key = key
+            return rebuilt
+
+    def _read_meta(self) -> dict | None:
+        if not self.db_path.exists():
+            return None
+        try:
+            with closing(self._connect()) as con:
+                row = con.execute("SELECT value FROM meta WHERE key = 'meta'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _meta_matches(self, meta: dict | None, fingerprint: dict) -> bool:
+        """ True if `meta` was built from the current CSV (a touched but unchanged file is re-stamped) """
+        if meta is None or meta.get('format_version') != SQLITE_FORMAT_VERSION:
+            return False
+        stored = meta.get('fingerprint', {})
+        if stored.get('size') != fingerprint['size']:
+            return False
+        if stored.get('mtime_ns') == fingerprint['mtime_ns']:
+            return True
+        fingerprint = SidecarCache(self.file_path).fingerprint()
+        if stored.get('blake2b') != fingerprint['blake2b']:
+            return False
+        meta['fingerprint'] = fingerprint
+        with closing(self._connect()) as con:
+            con.execute("UPDATE meta SET value = ? WHERE key = 'meta'", (json.dumps(meta),))
+            con.commit()
+        return True
+
+    def _ingest(self, fingerprint: dict) -> dict:
+        """ Stream the CSV into a fresh table, then index it and record the fingerprint """
+        tmp_path = self.db_path.with_name(self.db_path.name + '.tmp')
+        tmp_path.unlink(missing_ok=True)
+        dtypes: dict[str, str] = {}
+        with closing(sqlite3.connect(tmp_path)) as con:
+            for chunk in self.iter_chunks(self.ingest_chunksize):
+                for column, dtype in chunk.dtypes.items():
+                    dtypes[column] = self._merge_dtype(dtypes.get(column), dtype)
+                # The row label is stored so results keep the labels of an in-memory query
+                chunk.to_sql(DATA_TABLE, con, if_exists='append', index=True, index_label=ROW_COLUMN)
+            if not dtypes:
+                pd.DataFrame(columns=self.read_columns()).to_sql(DATA_TABLE, con, index=True, index_label=ROW_COLUMN)
+            for column in self.indexed_columns:
+                if column in dtypes:
+                    con.execute(f"CREATE INDEX {_quote('idx_' + column)} ON {DATA_TABLE} ({_quote(column)})")
+            meta = {'format_version': SQLITE_FORMAT_VERSION, 'fingerprint': fingerprint,
+                    'columns': list(dtypes), 'dtypes': dtypes}
+            con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            con.execute("INSERT INTO meta VALUES ('meta', ?)", (json.dumps(meta),))
+            con.commit()
+        tmp_path.replace(self.db_path)
+        return meta
+
+    @staticmethod
+    def _merge_dtype(previous: str | None, dtype) -> str:
+        """ Dtype covering every chunk seen so far (ints widen to float, mixed kinds to object) """
+        current = str(dtype)
+        if previous is None or previous == current:
+            return current
+        if {previous, current} <= {'int64', 'float64'}:
+            return 'float64'
+        return 'object'
+
+    def _read(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        """ Run a query returning table rows, restoring row labels and column dtypes """
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query(sql, con, params=_params(params), index_col=ROW_COLUMN)
+        return self._restore(df)
+
+    def _restore(self, df: pd.DataFrame) -> pd.DataFrame:
+        df.index.name = None
+        for column in df.columns:
+            dtype = self._dtypes.get(column)
+            if dtype is not None and str(df[column].dtype) != dtype and not (dtype.startswith('int') and df[column].isna().any()):
+                df[column] = df[column].astype(dtype)
+        return df
+
+    def _where_not_null(self, columns: Sequence[str]) -> str:
+        return " AND ".join(f"{_quote(col)} IS NOT NULL" for col in columns)
+
+    def _group_sums(self, group_by_columns: list[str], value_columns: list[str]) -> pd.DataFrame:
+        """ Group sums in key order, indexed by the keys like ``groupby(...).sum()`` """
+        keys = ", ".join(_quote(col) for col in group_by_columns)
+        sums = ", ".join(f"TOTAL({_quote(col)}) AS {_quote(col)}" for col in value_columns)
+        sql = (f"SELECT {keys}, {sums} FROM {DATA_TABLE} WHERE {self._where_not_null(group_by_columns)} "
+               f"GROUP BY {keys} ORDER BY {keys}")
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query(sql, con)
+        for column in value_columns:
+            # TOTAL() always returns a float (0.0 for no values), like pandas' NaN-skipping sum
+            if self._dtypes.get(column, '').startswith('int'):
+                df[column] = df[column].astype(self._dtypes[column])
+        for column in group_by_columns:
+            dtype = self._dtypes.get(column)
+            if dtype is not None and str(df[column].dtype) != dtype:
+                df[column] = df[column].astype(dtype)
+        return df.set_index(group_by_columns)
+
+    @memoized
+    def summarize_data(self, column_name: str='WHO Region', sort_by: str='Confirmed',
+                       chunksize: int | None = None):
+        """ 1. Display total confirmed, death, and recovered cases for each region (as SQL) """
+        self.ensure_ingested()
+        self._require_columns([column_name] + VALUE_COLUMNS)
+        return (
+            self._group_sums([column_name], VALUE_COLUMNS)
+                .reset_index()
+                .sort_values(by=sort_by, ascending=False)
+        )
+
+    @memoized
+    def filter_data(self, column_name='Confirmed', threshold=10, chunksize: int | None = None):
+        """ 2. Exclude entries where confirmed cases are < 10 (as SQL) """
+        self.ensure_ingested()
+        self._require_columns([column_name])
+        sql = f"SELECT * FROM {DATA_TABLE} WHERE {_quote(column_name)} > ? ORDER BY {ROW_COLUMN}"
+        if chunksize is not None:
+            return self._read_batches(sql, [threshold], chunksize)
+        return self._read(sql, [threshold])
+
+    def _read_batches(self, sql: str, params: Sequence, chunksize: int) -> Iterator[pd.DataFrame]:
+        with closing(self._connect()) as con:
+            for batch in pd.read_sql_query(sql, con, params=_params(params), index_col=ROW_COLUMN,
+                                           chunksize=chunksize):
+                yield self._restore(batch)
+
+    @memoized
+    def get_top_n(self, n=5, column_name: str | Sequence[str]='Confirmed',
+                  per_group: str | Sequence[str] | None = None):
+        """ 5. Top 5 Countries by Case Count (as SQL) """
+        return self._select_n_sql(n, column_name, ascending=False, per_group=per_group)
+
+    @memoized
+    def get_bottom_n(self, n=5, column_name: str | Sequence[str]='Deaths',
+                     per_group: str | Sequence[str] | None = None):
+        """ 6. Region with Lowest Death Count (as SQL) """
+        return self._select_n_sql(n, column_name, ascending=True, per_group=per_group)
+
+    def _select_n_sql(self, n: int, column_name: str | Sequence[str], ascending: bool,
+                      per_group: str | Sequence[str] | None) -> pd.DataFrame:
+        """
+        ``ORDER BY ... LIMIT n`` with the tie and missing-value rules of `DataAnalyzer._select_n`:
+        ties keep file order and missing ranking values sort last (or, for
+        numeric columns without groups, are never selected).
+        """
+        self.ensure_ingested()
+        columns = [column_name] if isinstance(column_name, str) else list(column_name)
+        group_columns = [] if per_group is None else [per_group] if isinstance(per_group, str) else list(per_group)
+        self._require_columns(columns + group_columns)
+        direction = 'ASC' if ascending else 'DESC'
+        order = ", ".join(f"{_quote(col)} IS NULL, {_quote(col)} {direction}" for col in columns)
+
+        if group_columns:
+            keys = ", ".join(_quote(col) for col in group_columns)
+            sql = (f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY {keys} ORDER BY {order}, {ROW_COLUMN}) "
+                   f"AS __rank__ FROM {DATA_TABLE} WHERE {self._where_not_null(group_columns)}) "
+                   f"WHERE __rank__ <= ? ORDER BY {keys}, __rank__")
+            return self._read(sql, [n]).drop(columns='__rank__')
+
+        numeric = all(np.dtype(self._dtypes.get(col, 'object')).kind in 'iuf' for col in columns)
+        where = f"WHERE {self._where_not_null(columns)} " if numeric else ""
+        return self._read(f"SELECT * FROM {DATA_TABLE} {where}ORDER BY {order}, {ROW_COLUMN} LIMIT ?", [n])
+
+    @memoized
+    def group_data(self, group_by_columns: Sequence[str], ascending=False, chunksize: int | None = None):
+        """ Group Data by Country and Region (as SQL) """
+        self.ensure_ingested()
+        self._require_columns(list(group_by_columns) + VALUE_COLUMNS)
+        return (
+            self._group_sums(list(group_by_columns), VALUE_COLUMNS)
+            .sort_values(by='Confirmed', ascending=ascending)
+            .reset_index()
+        )
+
+    @memoized
+    def fetch_data_by_country_by_column(self, country_names: Sequence[str],
+                                        column_names: Sequence[str],
+                                        filter_by: str='Country/Region'):
+        """ Fetch data for a specific country (as an indexed SQL lookup) """
+        self.ensure_ingested()
+        column_names = list(column_names)
+        self._require_columns([filter_by] + column_names)
+        keys = list(dict.fromkeys(country_names))
+        if not keys:
+            return self._read(f"SELECT {ROW_COLUMN}, {', '.join(map(_quote, column_names))} FROM {DATA_TABLE} LIMIT 0")
+        placeholders = ", ".join("?" * len(keys))
+        sql = (f"SELECT {ROW_COLUMN}, {', '.join(map(_quote, column_names))} FROM {DATA_TABLE} "
+               f"WHERE {_quote(filter_by)} IN ({placeholders}) ORDER BY {ROW_COLUMN}")
+        return self._read(sql, keys)
+
+    def lookup(self, keys: Hashable | Sequence[Hashable], key_column: str='Country/Region') -> pd.DataFrame:
+        """ Rows whose `key_column` equals `keys`, as an indexed SQL lookup """
+        keys = [keys] if isinstance(keys, str) or not isinstance(keys, Sequence) else keys
+        return self.fetch_data_by_country_by_column(keys, self.read_columns(), filter_by=key_column)
+
+    def invalidate_cache(self, drop_sidecar: bool = False):
+        """ Invalidate cached frames and results; the database is re-checked on the next query """
+        super().invalidate_cache(drop_sidecar=drop_sidecar)
+        self._ingested_key = None
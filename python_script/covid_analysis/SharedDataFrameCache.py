@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_MEMORY_BUDGET = 1 << 30  # 1 GiB
+
+
+class SharedDataFrameCache:
+    """
+    Process-wide LRU cache of loaded DataFrames with a memory budget.
+
+    Entries are keyed by ``(resolved path, size, mtime_ns)`` plus any load
+    options that change the frame (the "variant", e.g. compact dtypes), so
+    every `CSVHandler` reading the same version of a file shares one copy.
+    Only one version per path is kept: storing a newer version drops every
+    variant of the older one.
+
+    When the total (deep) memory of the cached frames exceeds the budget, the
+    least recently used entries are evicted. The entry being stored is never
+    evicted by its own insertion, so a single frame larger than the budget is
+    still cached, alone.
+
+    `lock` hands out one lock per file, under which handlers load it, so
+    concurrent cold loads of a file parse it once (single flight) and
+    `generation` tells a waiting reload whether another thread already
+    stored a fresh frame meanwhile.
+    """
+
+    def __init__(self, memory_budget: int | None = DEFAULT_MEMORY_BUDGET):
+        self._entries: OrderedDict[Hashable, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._memory_budget = memory_budget
+        self._bytes = 0
+        self._path_locks: dict[str, threading.RLock] = {}
+        # Frames stored per (path, variant), so waiters can detect a load that completed meanwhile
+        self._generations: dict[tuple, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(file_path: str | Path, *variant: Hashable) -> tuple:
+        """ Build the cache key for the current on-disk version of `file_path` """
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        return (str(path), stat.st_size, stat.st_mtime_ns) + variant
+
+    def lock(self, file_path: str | Path) -> threading.RLock:
+        """ The lock serializing loads (and invalidations) of `file_path` across handlers """
+        path = str(Path(file_path).resolve())
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.RLock())
+
+    def generation(self, file_path: str | Path, *variant: Hashable) -> int:
+        """ Number of frames stored so far for `file_path` with this variant """
+        with self._lock:
+            return self._generations.get((str(Path(file_path).resolve()),) + variant, 0)
+
+    @property
+    def memory_budget(self) -> int | None:
+        return self._memory_budget
+
+    def set_memory_budget(self, memory_budget: int | None):
+        """ Change the budget in bytes (None for unbounded), evicting as needed """
+        with self._lock:
+            self._memory_budget = memory_budget
+            self._evict(keep=None)
+
+    def get(self, key: Hashable) -> pd.DataFrame | None:
+        """ Return the cached frame for `key` (marking it recently used), or None """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: Hashable) -> pd.DataFrame | None:
+        """ Like `get` but without touching the LRU order or the counters """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key: Hashable, df: pd.DataFrame):
+        """ Store `df` under `key`, replacing older versions of the same path """
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._drop(stale)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (df, nbytes)
+            self._bytes += nbytes
+            generation = (key[0],) + key[3:]
+            self._generations[generation] = self._generations.get(generation, 0) + 1
+            self._evict(keep=key)
+
+    def discard(self, key: Hashable):
+        """ Remove `key` from the cache if present """
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self):
+        """ Drop every entry and reset the counters """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """ Snapshot of the hit/miss/eviction counters and current memory use """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'memory_budget': self._memory_budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _drop(self, key: Hashable):
+        _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def _evict(self, keep: Hashable | None):
+        if self._memory_budget is None:
+            return
+        for key in list(self._entries):
+            if self._bytes <= self._memory_budget:
+                break
+            if key == keep:
+                continue
+            self._drop(key)
+            self.evictions += 1
+
+
+_shared_cache = SharedDataFrameCache()
+
+
+def get_shared_cache() -> SharedDataFrameCache:
+    """ The process-wide cache used by every `CSVHandler` by default """
+    return _shared_cache
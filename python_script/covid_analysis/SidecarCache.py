@@ -0,0 +1,188 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import warnings
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIDECAR_SUFFIX = '.sidecar.npz'
+SIDECAR_FORMAT_VERSION = 2
+HASH_BLOCK_SIZE = 1 << 20  # 1 MiB blocks keep hashing memory flat on large CSVs
+# Array dtype an object column is stored as, by `pd.api.types.infer_dtype` of its non-null values
+OBJECT_STORAGE_DTYPES = {'string': str, 'empty': str, 'boolean': bool, 'integer': np.int64, 'floating': np.float64}
+
+
+class SidecarCache:
+    """
+    Columnar binary sidecar (``<csv>.sidecar.npz``) stored next to a CSV file.
+
+    Every column is written as its own NumPy array, so reading the sidecar back
+    skips CSV tokenising and type inference entirely, and a subset of columns
+    can be read without touching the others. The sidecar records the size,
+    mtime and content hash of the CSV it was built from and is only trusted
+    while all three still match the file on disk.
+
+    Notes
+    -----
+    Only formats that NumPy can store without pickling are used: numeric,
+    boolean and datetime columns are stored as-is, string (object) columns as
+    fixed-width unicode arrays plus a missing-value mask, and categorical
+    columns as integer codes plus their categories. Other object columns are
+    stored the same way only when all their values share one type (e.g.
+    booleans with blanks); a frame with a mixed-type column gets no sidecar.
+    """
+
+    def __init__(self, csv_path: str | Path):
+        self.csv_path = Path(csv_path)
+        self.path = self.csv_path.with_name(self.csv_path.name + SIDECAR_SUFFIX)
+
+    def fingerprint(self, with_hash: bool = True) -> dict:
+        """ Return the size, mtime and (optionally) content hash of the CSV """
+        stat = self.csv_path.stat()
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if with_hash:
+            fingerprint['blake2b'] = self._content_hash()
+        return fingerprint
+
+    def _content_hash(self) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.csv_path, 'rb') as fh:
+            for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _read_meta(self, npz) -> dict:
+        return json.loads(str(npz['__meta__']))
+
+    def is_fresh(self) -> bool:
+        """
+        True when the sidecar exists and was built from the current CSV.
+
+        The cheap size/mtime comparison runs first; the CSV is only hashed
+        when both of those still match.
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                meta = self._read_meta(npz)
+        except (OSError, ValueError, KeyError):
+            return False
+        if meta.get('format_version') != SIDECAR_FORMAT_VERSION:
+            return False
+        stored = meta.get('fingerprint', {})
+        current = self.fingerprint(with_hash=False)
+        if stored.get('size') != current['size'] or stored.get('mtime_ns') != current['mtime_ns']:
+            return False
+        return stored.get('blake2b') == self._content_hash()
+
+    def read(self, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """ Read the sidecar back as a DataFrame, optionally only some columns """
+        with np.load(self.path, allow_pickle=False) as npz:
+            return self.decode_frame(npz, columns)
+
+    def write(self, df: pd.DataFrame, fingerprint: dict | None = None) -> bool:
+        """
+        Write ``df`` as the sidecar for the current CSV.
+
+        The file is written to a temporary name and renamed into place, so a
+        crash never leaves a truncated sidecar behind. Returns False with a
+        warning (and leaves the CSV path usable) when the directory is not
+        writable or a column cannot be stored losslessly.
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint()
+
+        try:
+            arrays = self.encode_frame(df, format_version=SIDECAR_FORMAT_VERSION, fingerprint=fingerprint)
+        except TypeError as e:
+            warnings.warn(f"Skipping sidecar cache for {self.csv_path}: {e}", RuntimeWarning, stacklevel=2)
+            return False
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        try:
+            fd, tmp_name = tempfile.mkstemp(prefix=self.path.name, suffix='.tmp', dir=self.path.parent)
+            try:
+                with os.fdopen(fd, 'wb') as fh:
+                    fh.write(buffer.getbuffer())
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            warnings.warn(f"Skipping sidecar cache for {self.csv_path}: {e}", RuntimeWarning, stacklevel=2)
+            return False
+        return True
+
+    def remove(self):
+        """ Delete the sidecar file if present """
+        self.path.unlink(missing_ok=True)
+
+    @classmethod
+    def encode_frame(cls, df: pd.DataFrame, **meta) -> dict[str, np.ndarray]:
+        """
+        Encode `df` as pickle-free NumPy arrays for `np.savez`.
+
+        Extra keyword arguments are stored in the ``__meta__`` entry next to
+        the row count and column specs. Raises TypeError for an object column
+        whose values mix types, which no single array stores losslessly.
+        """
+        arrays = {}
+        specs = []
+        for position, (name, series) in enumerate(df.items()):
+            specs.append(cls._encode_column(arrays, f"c{position}", str(name), series))
+        arrays['__meta__'] = np.array(json.dumps({**meta, 'rows': len(df), 'columns': specs}))
+        return arrays
+
+    @classmethod
+    def decode_frame(cls, npz, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """ Rebuild a frame (or some of its columns) from an opened `encode_frame` archive """
+        meta = json.loads(str(npz['__meta__']))
+        specs = meta['columns']
+        if columns is not None:
+            by_name = {spec['name']: spec for spec in specs}
+            missing = [col for col in columns if col not in by_name]
+            if missing:
+                raise ValueError(f"Columns not found in the dataset: {missing}")
+            specs = [by_name[col] for col in columns]
+
+        data = {spec['name']: cls._decode_column(npz, spec) for spec in specs}
+        return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']), columns=[spec['name'] for spec in specs])
+
+    @staticmethod
+    def _encode_column(arrays: dict, key: str, name: str, series: pd.Series) -> dict:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[key] = series.cat.codes.to_numpy()
+            arrays[f"{key}_categories"] = series.cat.categories.to_numpy().astype(str)
+            return {'name': name, 'key': key, 'kind': 'category', 'ordered': bool(series.cat.ordered)}
+        if series.dtype == object:
+            value_kind = pd.api.types.infer_dtype(series, skipna=True)
+            if value_kind not in OBJECT_STORAGE_DTYPES:
+                raise TypeError(f"Column '{name}' holds mixed value types ({value_kind}).")
+            storage = OBJECT_STORAGE_DTYPES[value_kind]
+            mask = series.isna().to_numpy()
+            values = series.to_numpy(copy=True)
+            values[mask] = storage()
+            arrays[key] = values.astype(storage)
+            arrays[f"{key}_mask"] = mask
+            # Decoded back to an object column of the original Python values
+            return {'name': name, 'key': key, 'kind': 'string' if storage is str else 'object'}
+        arrays[key] = series.to_numpy()
+        return {'name': name, 'key': key, 'kind': 'array'}
+
+    @staticmethod
+    def _decode_column(npz, spec: dict):
+        key = spec['key']
+        if spec['kind'] == 'category':
+            return pd.Categorical.from_codes(npz[key], categories=npz[f"{key}_categories"],
+                                             ordered=spec['ordered'])
+        if spec['kind'] in ('string', 'object'):
+            values = npz[key].astype(object)
+            values[npz[f"{key}_mask"]] = np.nan
+            return values
+        return npz[key]
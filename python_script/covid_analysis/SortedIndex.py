@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+# Lookups selecting at least 1/SCAN_FRACTION of the rows scan the column with a boolean
+# mask (O(n), no sort); smaller ones sort their gathered positions back into file order
+SCAN_FRACTION = 8
+
+
+class SortedIndex:
+    """
+    Presorted secondary index over one numeric column.
+
+    Holds the stable argsort permutation of the column and the values in that
+    order (missing values last), so range and equality predicates are
+    answered with two binary searches and a gather of the matching row
+    positions instead of a scan of the whole column, and sorted scans reuse
+    the permutation instead of re-sorting.
+
+    Every lookup returns row *positions* (for `DataFrame.take`) in file
+    order, so results match the equivalent boolean-mask filter exactly.
+    The binary searches also count the matching rows; when a predicate
+    selects a large share of them, a mask scan of the column is cheaper than
+    sorting the gathered positions back into file order, and is used
+    instead.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.order = np.argsort(values, kind='stable')
+        self.sorted = values[self.order]
+        # NumPy sorts NaN to the end; those rows never match a comparison
+        self.valid = len(values) - int(np.isnan(self.sorted).sum()) if self.sorted.dtype.kind == 'f' else len(values)
+        self._descending: np.ndarray | None = None
+
+    @staticmethod
+    def supports(series: pd.Series) -> bool:
+        """ Whether `series` can be indexed (plain numeric, not bool or extension dtypes) """
+        return is_numeric_dtype(series.dtype) and not is_bool_dtype(series.dtype) \
+            and isinstance(series.dtype, np.dtype)
+
+    def _positions(self, ranges: list[tuple[int, int]], scan) -> np.ndarray:
+        """
+        Positions of the rows in the `(start, stop)` ranges of the sorted order, in file order.
+
+        `scan(values)` is the equivalent boolean mask over the column, used
+        when the ranges hold too many rows to sort.
+        """
+        selected = sum(stop - start for start, stop in ranges)
+        if selected * SCAN_FRACTION >= len(self.order):
+            return np.flatnonzero(scan(self.values))
+        return np.sort(np.concatenate([self.order[start:stop] for start, stop in ranges]))
+
+    def greater_than(self, threshold) -> np.ndarray:
+        """ Positions of rows with value > `threshold` """
+        return self._positions([(np.searchsorted(self.sorted[:self.valid], threshold, side='right'), self.valid)],
+                               lambda values: values > threshold)
+
+    def equal_to(self, value) -> np.ndarray:
+        """ Positions of rows with value == `value` """
+        valid = self.sorted[:self.valid]
+        return self._positions([(np.searchsorted(valid, value, side='left'), np.searchsorted(valid, value, side='right'))],
+                               lambda values: values == value)
+
+    def outside(self, lower, upper) -> np.ndarray:
+        """ Positions of rows with value < `lower` or value > `upper` """
+        if pd.isna(lower) or pd.isna(upper):
+            # Comparisons with NaN bounds are all False (searchsorted would rank NaN last instead)
+            return np.empty(0, dtype=self.order.dtype)
+        valid = self.sorted[:self.valid]
+        return self._positions([(0, np.searchsorted(valid, lower, side='left')),
+                                (np.searchsorted(valid, upper, side='right'), self.valid)],
+                               lambda values: (values < lower) | (values > upper))
+
+    def ordered(self, ascending: bool = True) -> np.ndarray:
+        """
+        Positions in sorted order, like a stable `sort_values`: ties keep
+        file order and missing values come last in either direction.
+        """
+        if ascending:
+            return self.order
+        if self._descending is None:
+            valid = self.sorted[:self.valid]
+            # Number runs of equal values; a stable sort on the negated run id reverses the
+            # runs while keeping every run in file order
+            run_id = np.concatenate([[0], np.cumsum(valid[1:] != valid[:-1])]) if self.valid else valid
+            descending = self.order[:self.valid][np.argsort(-run_id, kind='stable')]
+            self._descending = np.concatenate([descending, self.order[self.valid:]])
+        return self._descending
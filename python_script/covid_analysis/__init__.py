@@ -1,6 +1,21 @@
 # Public API for covid_analysis package
+from .AnalyticsService import AnalyticsService
+from .AppendTracker import AppendTracker
+from .ArrayAnalyzer import ArrayAnalyzer
 from .CSVHandler import CSVHandler
+from .ColumnTable import ColumnTable
+from .CompactSchema import CompactSchema
 from .DataAnalyser import DataAnalyzer
+from .DataExporter import DataExporter, get_exporter
+from .DatasetSchema import DatasetSchema, detect_schema, get_schema, register_schema
+from .LazyQuery import LazyQuery
+from .MultiFileLoader import MultiFileLoader, SnapshotCollection
+from .ParallelGroupBy import ParallelGroupBy
+from .QuantileSketch import QuantileSketch
+from .QueryMemo import QueryMemo
+from .RunningStats import RunningStats
+from .SharedDataFrameCache import SharedDataFrameCache, get_shared_cache
+from .SidecarCache import SidecarCache
+from .SQLiteAnalyzer import SQLiteAnalyzer
 
-__all__ = ["CSVHandler", "DataAnalyzer"]
-
+__all__ = ["AnalyticsService", "AppendTracker", "ArrayAnalyzer", "CSVHandler", "ColumnTable", "CompactSchema", "DataAnalyzer", "DataExporter", "DatasetSchema", "LazyQuery", "MultiFileLoader", "ParallelGroupBy", "QuantileSketch", "QueryMemo", "RunningStats", "SharedDataFrameCache", "SidecarCache", "SQLiteAnalyzer", "SnapshotCollection", "detect_schema", "get_exporter", "get_schema", "get_shared_cache", "register_schema"]
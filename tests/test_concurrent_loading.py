@@ -0,0 +1,142 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from python_script.covid_analysis import CSVHandler, DataAnalyzer, SharedDataFrameCache
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation
+
+THREADS = 8
+# Large enough that a parse takes long enough for the threads to overlap
+ROWS = 20_000
+VERSIONS = 10
+
+
+def write_version(path, version: int):
+    """ Write the CSV for `version` (one more row per version, so every version differs in size) """
+    rows = ROWS + version
+    df = pd.DataFrame({'Country/Region': [f"C{i}" for i in range(rows)],
+                       'Confirmed': np.arange(rows), 'Version': version})
+    tmp = path.with_suffix('.tmp')
+    df.to_csv(tmp, index=False)
+    # Replaced in one step, so readers never parse a half-written file
+    os.replace(tmp, path)
+
+
+def run_threads(*targets) -> list[BaseException]:
+    """ Run each target in its own thread and return the exceptions they raised """
+    errors = []
+
+    def run(target):
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_version(path, 0)
+    return path
+
+
+def record_parses(instrumentation: IOInstrumentation) -> list[dict]:
+    """ The 'load' events that parsed the CSV, collected as `instrumentation` reports them """
+    parses = []
+
+    def hook(event: dict):
+        if event['operation'] == 'load' and event['source'] == 'csv':
+            parses.append(event)
+
+    instrumentation.add_hook(hook)
+    return parses
+
+
+@pytest.mark.parametrize('shared_handler', [True, False])
+def test_cold_loaders_parse_csv_once(csv_path, shared_handler):
+    instrumentation = IOInstrumentation(console=False)
+    parses = record_parses(instrumentation)
+    cache = SharedDataFrameCache()
+
+    def handler():
+        return CSVHandler(csv_path, use_sidecar=False, cache=cache, instrumentation=instrumentation)
+
+    shared = handler()
+    barrier = threading.Barrier(THREADS)
+    frames = []
+
+    def load():
+        loader = shared if shared_handler else handler()
+        barrier.wait()
+        frames.append(loader.load_data())
+
+    assert run_threads(*[load] * THREADS) == []
+    assert len(parses) == 1
+    assert len(frames) == THREADS
+    assert all(df is frames[0] for df in frames)
+
+
+def test_readers_racing_invalidation_never_see_stale_data(csv_path):
+    analyzer = DataAnalyzer(csv_path, use_sidecar=False, cache=SharedDataFrameCache(),
+                            instrumentation=IOInstrumentation(console=False))
+    analyzer.load_data()
+    published = [0]
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            # A load that starts after a version was invalidated must return that version or a newer one
+            version = published[0]
+            df = analyzer.load_data()
+            assert df['Version'].iloc[0] >= version
+            assert len(df) == ROWS + df['Version'].iloc[0]
+
+    def write():
+        try:
+            for version in range(1, VERSIONS + 1):
+                write_version(csv_path, version)
+                if version % 2:
+                    analyzer.invalidate_cache()
+                else:
+                    analyzer.load_data(reload=True)
+                published[0] = version
+        finally:
+            done.set()
+
+    assert run_threads(write, *[read] * (THREADS - 1)) == []
+    df = analyzer.load_data()
+    assert df['Version'].iloc[0] == VERSIONS
+    assert len(df) == ROWS + VERSIONS
+
+
+def test_cache_hits_racing_invalidation(csv_path):
+    handler = CSVHandler(csv_path, use_sidecar=False, cache=SharedDataFrameCache(),
+                         instrumentation=IOInstrumentation(console=False))
+    handler.load_data()
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            assert len(handler.load_data()) == ROWS
+
+    def invalidate():
+        try:
+            for _ in range(20):
+                handler.invalidate_cache()
+                handler.load_data()
+        finally:
+            done.set()
+
+    assert run_threads(invalidate, *[read] * (THREADS - 1)) == []
+    # Every recorded key still names a cached frame
+    assert len(handler._cached_frames) == len(handler._cache_keys) == 1
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from python_script.covid_analysis import DataAnalyzer, SharedDataFrameCache
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation
+
+VALUES = ['Confirmed', 'Deaths', 'Recovered']
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Country/Region': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'Confirmed': [50, 10, 30, 30, 70, 20],
+        'Deaths': [5, 1, 9, 3, 9, 2],
+        'Recovered': [40, 8, 20, 25, 50, 15],
+        'WHO Region': ['Europe', 'Africa', 'Europe', 'Americas', 'Africa', 'Europe'],
+    })
+
+
+@pytest.fixture
+def analyzer(tmp_path, frame) -> DataAnalyzer:
+    path = tmp_path / 'data.csv'
+    frame.to_csv(path, index=False)
+    return DataAnalyzer(path, use_sidecar=False, cache=SharedDataFrameCache(),
+                        instrumentation=IOInstrumentation(console=False))
+
+
+def assert_rows_equal(result: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_wider_select_before_group(analyzer, frame):
+    columns = ['Country/Region', 'WHO Region'] + VALUES
+    result = analyzer.query().select(columns).group(['WHO Region']).collect()
+    assert_rows_equal(result, frame[columns].groupby(['WHO Region'])[VALUES].sum().reset_index())
+
+
+def test_narrowing_selects_before_head(analyzer, frame):
+    result = (analyzer.query()
+              .select(['Country/Region', 'Confirmed', 'Deaths'])
+              .select(['Country/Region', 'Confirmed'])
+              .head(2)
+              .collect())
+    assert_rows_equal(result, frame[['Country/Region', 'Confirmed']].head(2))
+
+
+def test_select_between_sort_and_head_becomes_top_n(analyzer, frame):
+    query = analyzer.query().sort('Deaths', ascending=False).select(['Country/Region', 'Confirmed']).head(3)
+    assert [step[0] for step in query.plan()] == ['scan', 'topn', 'select']
+    expected = frame.sort_values('Deaths', ascending=False, kind='stable')[['Country/Region', 'Confirmed']].head(3)
+    assert_rows_equal(query.collect(), expected)
+
+
+def test_select_cut_to_columns_used_later(analyzer, frame):
+    query = (analyzer.query()
+             .select(['Deaths', 'Country/Region', 'Confirmed'])
+             .filter('Confirmed', '>', 15)
+             .sort('Deaths')
+             .select(['Country/Region']))
+    assert query.plan()[0] == ('scan', ('Country/Region', 'Confirmed', 'Deaths'))
+    expected = frame[frame['Confirmed'] > 15].sort_values('Deaths', kind='stable')[['Country/Region']]
+    assert_rows_equal(query.collect(), expected)
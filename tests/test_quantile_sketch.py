@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from python_script.covid_analysis import DataAnalyzer, QuantileSketch
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation
+
+QUANTILES = np.linspace(0.05, 0.95, 19)
+
+
+def rank_errors(values: np.ndarray, estimates: np.ndarray) -> np.ndarray:
+    """ Distance of each estimate's normalized rank in `values` from its target quantile """
+    ordered = np.sort(values)
+    lower = np.searchsorted(ordered, estimates, side='left') / ordered.size
+    upper = np.searchsorted(ordered, estimates, side='right') / ordered.size
+    return np.maximum(0, np.maximum(lower - QUANTILES, QUANTILES - upper))
+
+
+def test_small_input_is_exact():
+    values = np.random.default_rng(0).normal(size=100)
+    sketch = QuantileSketch.from_values(values)
+    assert sketch.exact
+    np.testing.assert_allclose(sketch.quantile(QUANTILES), np.quantile(values, QUANTILES))
+
+
+@pytest.mark.parametrize('error', [0.05, 0.01])
+def test_single_sketch_within_error(error):
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch = QuantileSketch.from_values(values, error)
+    assert not sketch.exact
+    assert rank_errors(values, sketch.quantile(QUANTILES)).max() <= error
+
+
+@pytest.mark.parametrize('error, chunks', [(0.05, 1000), (0.01, 1000)])
+def test_merged_chunk_sketches_within_error(error, chunks):
+    # Every chunk sketch uses the default seed; the merges must still draw independent offsets
+    values = np.random.default_rng(2).random(chunks * 500)
+    merged = QuantileSketch(error)
+    for chunk in np.array_split(values, chunks):
+        merged = merged.merge(QuantileSketch.from_values(chunk, error))
+    assert merged.count == values.size
+    assert rank_errors(values, merged.quantile(QUANTILES)).max() <= error
+
+
+def test_merge_order_does_not_matter_for_accuracy():
+    values = np.random.default_rng(3).exponential(size=100_000)
+    sketches = [QuantileSketch.from_values(chunk, 0.02) for chunk in np.array_split(values, 200)]
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged = sketch.merge(merged)
+    assert rank_errors(values, merged.quantile(QUANTILES)).max() <= 0.02
+
+
+def test_streamed_iqr_bounds_match_exact_bounds(tmp_path):
+    values = np.random.default_rng(4).integers(0, 1_000_000, size=50_000)
+    path = tmp_path / 'values.csv'
+    pd.DataFrame({'Confirmed': values}).to_csv(path, index=False)
+    analyzer = DataAnalyzer(path, use_sidecar=False, instrumentation=IOInstrumentation(console=False))
+
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    exact_iqr = q3 - q1
+    lower, upper = analyzer.iqr_bounds('Confirmed', error=0.01, chunksize=1_000)
+    # Each quartile is within 1% rank of the truth, ~1% of the range on uniform values;
+    # the bounds weigh the quartiles by 2.5 and 1.5
+    tolerance = 0.01 * (values.max() - values.min()) * (2.5 + 1.5)
+    assert abs(lower - (q1 - 1.5 * exact_iqr)) <= tolerance
+    assert abs(upper - (q3 + 1.5 * exact_iqr)) <= tolerance
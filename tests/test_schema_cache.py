@@ -0,0 +1,28 @@
+import pandas as pd
+
+from python_script.covid_analysis import CSVHandler, DatasetSchema, SharedDataFrameCache
+from python_script.covid_analysis.IOInstrumentation import IOInstrumentation
+
+SCHEMA = DatasetSchema('test_counts', {'Country/Region': 'string', 'Confirmed': 'int'})
+
+
+def test_schema_and_plain_handlers_do_not_share_frames(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'Country/Region': ['A', 'B', 'C'], 'Confirmed': ['1', 'x', '3']}).to_csv(path, index=False)
+    cache = SharedDataFrameCache()
+    instrumentation = IOInstrumentation(console=False)
+    plain = CSVHandler(path, use_sidecar=False, cache=cache, instrumentation=instrumentation, schema=None)
+    checked = CSVHandler(path, use_sidecar=False, cache=cache, instrumentation=instrumentation, schema=SCHEMA)
+
+    raw = plain.load_data()
+    assert raw['Confirmed'].tolist() == ['1', 'x', '3']
+
+    validated = checked.load_data()
+    assert checked.schema_validated
+    assert validated['Confirmed'].sum() == 4
+    assert validated['Confirmed'].isna().tolist() == [False, True, False]
+
+    # Each handler keeps getting its own version of the frame from the cache
+    assert plain.load_data() is raw
+    assert checked.load_data() is validated
+    assert plain.data_version != checked.data_version
@@ -53,8 +53,7 @@ class CoronaDataAnalysis(DataAnalyzer):
 
         # 7. India’s Case Summary (as of snapshot date)
         print("7. India's case summary:")
-        india_data = self.load_data()
-        india_summary = india_data[india_data['Country/Region'] == 'India']
+        india_summary = self.lookup('India')
         if india_summary.empty:
             print("No data found for India.")
         else:
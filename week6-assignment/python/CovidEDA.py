@@ -1,12 +1,13 @@
 from pathlib import Path
 import warnings
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 
-from python_script.covid_analysis import DataAnalyzer
+from python_script.covid_analysis import DataAnalyzer, QuantileSketch, RunningStats
 from python_script.plot_images import PlotImages
 
 # Suppress FutureWarnings from seaborn/pandas compatibility issues
@@ -22,29 +23,32 @@ class CovidEDA(DataAnalyzer, PlotImages):
 
     def get_filtered_columns(self, columns: str|list = 'Confirmed'):
         """ Return only specified column(s) from the dataset """
-        df = self.load_data()
+        available_columns = self.read_columns()
 
         # Set upto display floats with 2 decimal places
         pd.options.display.float_format = '{:.2f}'.format
 
         if isinstance(columns, str):
-            if columns not in df.columns:
+            if columns not in available_columns:
                 raise ValueError(f"Column '{columns}' not found in the dataset.")
-            df = df.loc[:, [columns]]
             columns_list = [columns]
         elif isinstance(columns, list):
-            missing_columns = [col for col in columns if col not in df.columns]
+            missing_columns = [col for col in columns if col not in available_columns]
             if missing_columns:
                 raise ValueError(f"Columns not found in the dataset: {missing_columns}")
-            df = df.loc[:, columns]
             columns_list = columns
         else:
             raise TypeError("Parameter 'columns' must be a string or a list of strings.")
 
+        # Only the requested columns are parsed; copy because they are cleaned in-place below
+        df = self.load_data(columns=columns_list, copy=True)
+
         # Clean data: drop rows with NaN in specified columns
-        # Convert to numeric (in case some entries are strings)
+        # Convert to numeric (in case some entries are strings); columns the schema declares
+        # numeric were already coerced once when the data was loaded
+        coerced = self.schema.numeric_columns if self.schema_validated else frozenset()
         for col in columns_list:
-            if col in df.columns:
+            if col in df.columns and col not in coerced:
                 df.loc[:, col] = pd.to_numeric(df[col], errors='coerce')
 
         # Drop rows that couldn't be converted (if any)
@@ -52,47 +56,76 @@ class CovidEDA(DataAnalyzer, PlotImages):
 
         return df
 
-    def remove_outlier_IQR(self, df: pd.DataFrame, columns: str | list):
+    def remove_outlier_IQR(self, df: pd.DataFrame, columns: str | list, quantile_error: float | None = None,
+                           bounds: str = 'sequential', return_type: str = 'frame'):
         """ Remove outliers from DataFrame column(s) using the IQR method
 
         Args:
             df: Input DataFrame
             columns: Single column name (str) or list of column names to remove outliers from
+            quantile_error: If set, Q1/Q3 come from a `QuantileSketch` with this rank
+                error instead of an exact sort (exact anyway on small columns)
+            bounds: 'sequential' computes each column's bounds on the rows kept by the
+                previous columns (the original behaviour); 'joint' computes every
+                column's bounds on the full input in one quantile call
+            return_type: 'frame' for the cleaned DataFrame, 'mask' for a boolean Series
+                aligned with `df`, or 'index' for the index labels of the kept rows
+                (no copy of the data is made for 'mask' and 'index')
 
         Returns:
-            DataFrame with outliers removed from specified column(s)
+            DataFrame with outliers removed from specified column(s), or its mask/index
         """
         # Convert single column to list for uniform processing
         if isinstance(columns, str):
             columns = [columns]
         elif not isinstance(columns, list):
             raise TypeError("Parameter 'columns' must be a string or a list of strings.")
+        if bounds not in ('sequential', 'joint'):
+            raise ValueError("Parameter 'bounds' must be 'sequential' or 'joint'.")
+        if return_type not in ('frame', 'mask', 'index'):
+            raise ValueError("Parameter 'return_type' must be 'frame', 'mask' or 'index'.")
 
         # Validate all columns exist
         missing_columns = [col for col in columns if col not in df.columns]
         if missing_columns:
             raise ValueError(f"Columns not found in the DataFrame: {missing_columns}")
 
-        # Start with the original dataframe
-        cleaned_df = df.copy()
-
-        # Iterate through each column and remove outliers
-        for column in columns:
-            # Calculate IQR for current column
-            Q1 = cleaned_df[column].quantile(0.25)
-            Q3 = cleaned_df[column].quantile(0.75)
+        values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+        if bounds == 'joint':
+            # One quantile call for every column, one combined mask
+            Q1, Q3 = self._quartiles(values, quantile_error)
             IQR = Q3 - Q1
-
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            # Filter out outliers for this column
-            cleaned_df = cleaned_df[(cleaned_df[column] >= lower_bound) & (cleaned_df[column] <= upper_bound)]
-
+            keep = ((values >= Q1 - 1.5 * IQR) & (values <= Q3 + 1.5 * IQR)).all(axis=1)
+        else:
+            # Each column sees only the rows kept so far; the mask is narrowed, never the frame
+            keep = np.ones(len(df), dtype=bool)
+            for position in range(len(columns)):
+                column_values = values[:, position]
+                Q1, Q3 = self._quartiles(column_values[keep, None], quantile_error)
+                IQR = Q3[0] - Q1[0]
+                keep &= (column_values >= Q1[0] - 1.5 * IQR) & (column_values <= Q3[0] + 1.5 * IQR)
+
+        if return_type == 'mask':
+            return pd.Series(keep, index=df.index)
+        if return_type == 'index':
+            return df.index[keep]
         # Reset index to have sequential indices from 0 to n-1
-        cleaned_df = cleaned_df.reset_index(drop=True)
-
-        return cleaned_df
+        return df[keep].reset_index(drop=True)
+
+    @staticmethod
+    def _quartiles(values: np.ndarray, quantile_error: float | None) -> tuple[np.ndarray, np.ndarray]:
+        """ Q1 and Q3 of every column of a 2-D array, skipping NaN like `Series.quantile` """
+        if quantile_error is not None:
+            quartiles = np.array([QuantileSketch.from_values(values[:, i], quantile_error).quantile([0.25, 0.75])
+                                  for i in range(values.shape[1])]).reshape(-1, 2)
+            return quartiles[:, 0], quartiles[:, 1]
+        if values.shape[0] == 0:
+            return np.full(values.shape[1], np.nan), np.full(values.shape[1], np.nan)
+        with warnings.catch_warnings():
+            # Columns with no values left give NaN bounds (every row dropped), as pandas does
+            warnings.simplefilter('ignore', RuntimeWarning)
+            Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        return Q1, Q3
 
 
     def normalize_data_standard_Scaler(self, df: pd.DataFrame, columns: str | list):
@@ -141,11 +174,14 @@ class CovidEDA(DataAnalyzer, PlotImages):
         print("\n" + "=" * 50 + "\n")
 
         # 2. Compute Statistical Measures
-        # Calculate and print Mean
-        mean_values = filtered_df.mean()
-        median_values = filtered_df.median()
-        variance_values = filtered_df.var()
-        std_values = filtered_df.std()
+        # Mean, variance and std come from one Welford pass per column
+        column_stats = RunningStats.from_frame(filtered_df)
+        mean_values = pd.Series({col: stats.mean for col, stats in column_stats.items()})
+        # Medians from quantile sketches (exact while a column fits in the sketch)
+        median_values = pd.Series({col: QuantileSketch.from_values(filtered_df[col]).quantile(0.5)
+                                   for col in filtered_df.columns})
+        variance_values = pd.Series({col: stats.var() for col, stats in column_stats.items()})
+        std_values = pd.Series({col: stats.std() for col, stats in column_stats.items()})
         corr_matrix = filtered_df.corr()
 
         print("Mean:\n", mean_values)
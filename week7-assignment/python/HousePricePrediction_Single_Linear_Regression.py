@@ -165,8 +165,8 @@ class HousePricePrediction_Single_Linear_Regression(CSVHandler, PlotImages):
         #o Load the provided dataset using Pandas.
         #o Retain only the columns "Square Footage" and "Price# for model building.
 
-        df = self.load_data()
-        df = df[['Square_Footage', 'House_Price']].dropna()
+        df = self.load_data(columns=['Square_Footage', 'House_Price'])
+        df = df.dropna()
 
 
         #2. Exploratory Data Analysis (EDA)